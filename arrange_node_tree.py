@@ -1,41 +1,27 @@
+import os
+import sys
 import bpy
-from mathutils import Vector
+
+# blender doesn't put the script's folder on sys.path, needed to find ts4_layout
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+import ts4_layout
 
 
 def main(context):
     model = context.view_layer.objects.active
-    tree = model.active_material.node_tree
-    nodes = tree.nodes
-    # declare nodes
-    bsdf = nodes.get('Principled BSDF')
-    mat_output = nodes.get('Material Output')
-    base_color = nodes.get('Image Texture')
-    ambient = nodes.get('RGB')
-    specular = nodes.get('Image Texture.001')
-    # this part works
-    ambient_x = mat_output.location[0]
-    ambient_y = mat_output.location[1] - mat_output.dimensions[1]
-    ambient.location = (ambient_x, ambient_y)
-
-    if 'Image Texture.002' in nodes:
-        y_gap = base_color.location[1] - (base_color.dimensions[1] + specular.dimensions[1])
-        normal_map = nodes.get('Normal Map')
-        normal_map_x = base_color.location[0] + (base_color.dimensions[0]/2) - (normal_map.dimensions[0]/2)
-        normal_map_y = base_color.location[1] - base_color.dimensions[1]
-        normal_map.location = (normal_map_x, normal_map_y)
-
-        mapping = nodes.get('Mapping')
-        mapping.location[0] = base_color.location[0] - mapping.dimensions[0]
-        mapping.location[1] = normal_map.location[1]
-
-        normal = nodes.get('Image Texture.002')
-        normal.location[0] = mapping.location[0] - normal.dimensions[0]
-        normal.location[1] = normal_map.location[1]
-
-    else:
-        specular.location[0] = base_color.location[0]
-        specular.location[1] = base_color.location[1] - base_color.dimensions[1]
+    ts4_layout.arrange_tree(model.active_material.node_tree)
+
 
+# tidies every material in the file in one go, returns how many were arranged
+def arrange_all(materials):
+    count = 0
+    for material in materials:
+        if material.use_nodes and material.node_tree and not material.library:
+            ts4_layout.arrange_tree(material.node_tree)
+            count += 1
+    return count
 
 
 class SimpleOperator(bpy.types.Operator):
@@ -45,25 +31,40 @@ class SimpleOperator(bpy.types.Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.active_object is not None
+        return context.active_object is not None and context.active_object.active_material is not None
 
     def execute(self, context):
         main(context)
         return {'FINISHED'}
 
 
+class ArrangeAllMaterials(bpy.types.Operator):
+    """Auto arrange the shader nodes of every material in the file"""
+    bl_idname = "object.arrange_all_materials"
+    bl_label = "Arrange All Material Nodes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        count = arrange_all(bpy.data.materials)
+        self.report({'INFO'}, f'Arranged {count} materials')
+        return {'FINISHED'}
+
+
 def menu_func(self, context):
     self.layout.operator(SimpleOperator.bl_idname, text=SimpleOperator.bl_label)
+    self.layout.operator(ArrangeAllMaterials.bl_idname, text=ArrangeAllMaterials.bl_label)
 
 
 # Register and add to the "object" menu (required to also use F3 search "Simple Object Operator" for quick access).
 def register():
     bpy.utils.register_class(SimpleOperator)
+    bpy.utils.register_class(ArrangeAllMaterials)
     bpy.types.VIEW3D_MT_object.append(menu_func)
 
 
 def unregister():
     bpy.utils.unregister_class(SimpleOperator)
+    bpy.utils.unregister_class(ArrangeAllMaterials)
     bpy.types.VIEW3D_MT_object.remove(menu_func)
 
 
@@ -71,4 +72,4 @@ if __name__ == "__main__":
     register()
 
     # test call
-    bpy.ops.object.simple_operator()
\ No newline at end of file
+    bpy.ops.object.simple_operator()
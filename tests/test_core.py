@@ -0,0 +1,210 @@
+import os
+
+import numpy as np
+import pytest
+
+import ts4_core
+
+# ts4_core is plain python and numpy, so all of this runs without blender
+
+NUMBERS = np.arange(1000, 1020)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+	# chunks a few bytes long, so nearly every number lands on a chunk boundary somewhere
+	def set_chunk(size):
+		monkeypatch.setattr(ts4_core, 'CHUNK', size)
+	return set_chunk
+
+
+@pytest.mark.parametrize('separator', [b' ', b'\t', b'\n', b'\r\n', b' \t\r\n', b'\t' * 12])
+@pytest.mark.parametrize('chunk', [1, 2, 3, 5, 8, 13, 4096])
+@pytest.mark.parametrize('count', [None, len(NUMBERS), 5])
+def test_decode_block_chunk_boundaries(small_chunks, separator, chunk, count):
+	small_chunks(chunk)
+	data = b'\n\t' + separator.join(str(number).encode() for number in NUMBERS) + b' \r\n'
+	out = ts4_core._decode_block(data, 0, len(data), np.int32, count)
+	np.testing.assert_array_equal(out, NUMBERS)
+
+
+def test_decode_block_floats(small_chunks):
+	small_chunks(7)
+	numbers = np.linspace(-1, 1, 50, dtype=np.float32)
+	data = '\t'.join(f'{number:.7g}' for number in numbers).encode()
+	np.testing.assert_allclose(ts4_core._decode_block(data, 0, len(data), np.float32), numbers, rtol=1e-6)
+
+
+def test_decode_block_token_longer_than_chunk(small_chunks):
+	small_chunks(2)
+	data = b'123456789 42'
+	np.testing.assert_array_equal(ts4_core._decode_block(data, 0, len(data), np.int64), [123456789, 42])
+
+
+@pytest.mark.parametrize('data', [b'', b' ', b'\r\n\t '])
+def test_decode_block_empty(small_chunks, data):
+	small_chunks(1)
+	assert len(ts4_core._decode_block(data, 0, len(data), np.int32)) == 0
+
+
+# a small synthetic TSR export, with textures and a normal map next to it
+@pytest.fixture(scope='module')
+def dae_path(tmp_path_factory):
+	import ts4_synth
+	return ts4_synth.write_model(str(tmp_path_factory.mktemp('dae')), 'Test Sim', vertices=500, glass=True, joint_count=12)
+
+
+def scene_arrays(dae):
+	arrays = []
+	for geometry in sorted(dae.geometries.values(), key=lambda geometry: geometry.id):
+		arrays += [array for source, (array, stride) in sorted(geometry.sources.items())]
+		for primitive in geometry.primitives:
+			arrays += [primitive.p, primitive.vcount if primitive.vcount is not None else np.zeros(0)]
+	for controller in sorted(dae.controllers.values(), key=lambda controller: controller.id):
+		arrays += [controller.v, controller.vcount, controller.weights, controller.inv_bind_matrices]
+	return arrays
+
+
+def assert_same_scene(a, b):
+	assert a.images == b.images
+	assert a.effects == b.effects
+	assert a.materials == b.materials
+	assert [node.name for node in a.nodes] == [node.name for node in b.nodes]
+	arrays_a, arrays_b = scene_arrays(a), scene_arrays(b)
+	assert len(arrays_a) == len(arrays_b)
+	for array_a, array_b in zip(arrays_a, arrays_b):
+		np.testing.assert_array_equal(array_a, array_b)
+
+
+def test_read_dae_mmap_matches_bytes(dae_path):
+	with open(dae_path, 'rb') as file:
+		data = file.read()
+	assert_same_scene(ts4_core.read_dae(dae_path), ts4_core.read_dae(dae_path, data))
+
+
+def test_read_dae_small_chunks(dae_path, small_chunks):
+	expected = ts4_core.read_dae(dae_path)
+	small_chunks(61)
+	assert_same_scene(ts4_core.read_dae(dae_path), expected)
+
+
+def test_read_dae_arrays_match_elementtree(dae_path):
+	import xml.etree.ElementTree as ET
+	dae = ts4_core.read_dae(dae_path)
+	root = ET.parse(dae_path).getroot()
+	for geometry in root.iter(f'{ts4_core.COLLADA_NS}geometry'):
+		for source in geometry.iter(f'{ts4_core.COLLADA_NS}source'):
+			expected = np.array(source.find(f'{ts4_core.COLLADA_NS}float_array').text.split(), dtype=np.float32)
+			array, stride = dae.geometries[geometry.get('id')].sources[source.get('id')]
+			np.testing.assert_array_equal(array.ravel(), expected)
+
+
+def test_image_paths_match_read_dae(tmp_path):
+	(tmp_path / 'my dir').mkdir()
+	dae_path = tmp_path / 'Sim.dae'
+	dae_path.write_text(f'''<?xml version="1.0"?>
+<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1"><library_images>
+<image id="a"><init_from>file://{tmp_path.as_posix()}/my%20dir/a.png</init_from></image>
+<image id="b"><init_from><ref>my%20dir/b&amp;c.png</ref></init_from></image>
+<image id="c"><init_from>
+	c.png
+</init_from></image>
+</library_images></COLLADA>''')
+	paths = ts4_core.image_paths(str(dae_path), dae_path.read_bytes())
+	dae = ts4_core.read_dae(str(dae_path))
+	assert paths == sorted({*dae.images.values(), ts4_core.normal_map_path(str(dae_path))})
+	assert str(tmp_path / 'my dir' / 'a.png') in paths
+	assert ts4_core.read_image_paths(str(dae_path)) == paths
+
+
+@pytest.mark.skipif(os.name != 'nt', reason='C:/ is only an absolute path on windows')
+def test_resolve_image_path_windows_url():
+	assert ts4_core.resolve_image_path('/models', 'file:///C:/Sims%204/tex.png') == os.path.normpath('C:/Sims 4/tex.png')
+
+
+def test_get_filepaths(tmp_path):
+	for name in ('b.dae', 'a.DAE', 'notes.txt'):
+		(tmp_path / name).write_text('')
+	directory = str(tmp_path)
+	assert ts4_core.get_filepaths(directory, []) == [os.path.join(directory, 'a.DAE'), os.path.join(directory, 'b.dae')]
+	assert ts4_core.get_filepaths(directory, ['', 'b.dae']) == [os.path.join(directory, 'b.dae')]
+	assert ts4_core.get_filepaths('', [], '/x/y.dae') == ['/x/y.dae']
+	assert ts4_core.get_filepaths('', []) == []
+
+
+def brute_force_doubles(positions, threshold):
+	labels = list(range(len(positions)))
+
+	def root(index):
+		while labels[index] != index:
+			index = labels[index]
+		return index
+	for a in range(len(positions)):
+		for b in range(a + 1, len(positions)):
+			if ((positions[a] - positions[b]) ** 2).sum() <= threshold * threshold:
+				low, high = sorted((root(a), root(b)))
+				labels[high] = low
+	return np.array([root(index) for index in range(len(positions))])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_find_doubles_matches_brute_force(seed):
+	rng = np.random.default_rng(seed)
+	threshold = 0.01
+	positions = rng.random((300, 3)) * 0.2
+	# exact copies and near copies, some just inside and some just outside the threshold
+	positions = np.concatenate([
+		positions,
+		positions[:40],
+		positions[40:80] + rng.normal(size=(40, 3)) * threshold * 0.3,
+		positions[80:100] + [threshold * 1.01, 0, 0],
+	])
+	np.testing.assert_array_equal(ts4_core.find_doubles(positions, threshold), brute_force_doubles(positions, threshold))
+
+
+def test_find_doubles_small():
+	np.testing.assert_array_equal(ts4_core.find_doubles(np.zeros((0, 3)), 0.1), [])
+	np.testing.assert_array_equal(ts4_core.find_doubles(np.zeros((1, 3)), 0.1), [0])
+	np.testing.assert_array_equal(ts4_core.find_doubles(np.array([[0, 0, 0], [0.05, 0, 0], [1, 1, 1]]), 0.1), [0, 0, 2])
+
+
+def make_controller(vcount, influences, weights, joint_count=8):
+	controller = ts4_core.DaeController('skin', 'skin', 'mesh')
+	controller.joints = [f'joint{index}' for index in range(joint_count)]
+	controller.weights = np.array(weights, dtype=np.float32)
+	controller.vcount = np.array(vcount, dtype=np.int32)
+	controller.v = np.array(influences, dtype=np.int32).ravel()
+	return controller
+
+
+def test_skin_weights():
+	# vertex 0 has six influences, vertex 1 one plus the bind shape (joint -1), vertex 2 none
+	weights = [0.3, 0.25, 0.2, 0.1, 0.1, 0.05, 1.0, 0.5]
+	influences = [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (-1, 7)]
+	vertices, joints, result = ts4_core.skin_weights(make_controller([6, 2, 0], influences, weights))
+	# only the four strongest of vertex 0 are kept, renormalized
+	assert list(vertices) == [0, 0, 0, 0, 1]
+	assert list(joints) == [0, 1, 2, 3, 6]
+	kept = np.array([0.3, 0.25, 0.2, 0.1])
+	np.testing.assert_allclose(result[:4], kept / kept.sum(), atol=ts4_core.WEIGHT_STEP)
+	assert result[4] == 1.0
+
+
+def test_skin_weights_random():
+	rng = np.random.default_rng(0)
+	vcount = rng.integers(1, 9, 200)
+	weights = rng.random(vcount.sum()).astype(np.float32)
+	influences = np.stack([rng.integers(0, 8, vcount.sum()), np.arange(vcount.sum())], axis=1)
+	vertices, joints, result = ts4_core.skin_weights(make_controller(vcount, influences, weights))
+	assert result.dtype == np.float32
+	assert np.bincount(vertices).max() <= ts4_core.MAX_INFLUENCES
+	# every weight sits on the 1/1024 grid and each vertex adds up to exactly one
+	np.testing.assert_array_equal(result / ts4_core.WEIGHT_STEP, np.round(result / ts4_core.WEIGHT_STEP))
+	np.testing.assert_array_equal(np.bincount(vertices, result), 1)
+
+
+def test_skin_weights_tiny_weight_renormalized():
+	# the last weight rounds away to nothing, what's left still adds up to one
+	vertices, joints, result = ts4_core.skin_weights(make_controller([3], [(0, 0), (1, 1), (2, 2)], [0.6, 0.3999, 0.0001]))
+	assert list(joints) == [0, 1]
+	assert result.sum() == 1.0
@@ -0,0 +1,43 @@
+from ts4_layout import layout, GAP_X, GAP_Y
+
+# ts4_layout's layout() is plain python, arrange_tree is the part that needs blender
+
+# output <- bsdf <- three textures, one of them also feeding a mix that goes into the bsdf
+SIZES = [(240, 300), (240, 600), (240, 270), (240, 270), (240, 270), (140, 120)]
+LINKS = [(1, 0, 0), (2, 1, 0), (3, 1, 5), (4, 5, 1), (2, 5, 0), (5, 1, 9)]
+
+
+def overlaps(a, size_a, b, size_b):
+	# y grows upwards, positions are top left corners
+	return a[0] < b[0] + size_b[0] and b[0] < a[0] + size_a[0] and a[1] - size_a[1] < b[1] and b[1] - size_b[1] < a[1]
+
+
+def test_layout_anchor():
+	positions = layout(SIZES, LINKS, (100, 50))
+	assert positions[0] == (100, 50)
+
+
+def test_layout_sources_left_of_targets():
+	positions = layout(SIZES, LINKS)
+	for source, target, slot in LINKS:
+		assert positions[source][0] + SIZES[source][0] + GAP_X <= positions[target][0] + 1e-6
+
+
+def test_layout_no_overlaps():
+	positions = layout(SIZES, LINKS)
+	for a in range(len(SIZES)):
+		for b in range(a + 1, len(SIZES)):
+			assert not overlaps(positions[a], SIZES[a], positions[b], SIZES[b])
+
+
+def test_layout_column_stacks_downwards():
+	# two textures feeding one node end up one above the other with a gap
+	positions = layout([(200, 100), (200, 80), (200, 80)], [(1, 0, 0), (2, 0, 1)])
+	assert positions[1][0] == positions[2][0]
+	assert positions[2][1] <= positions[1][1] - 80 - GAP_Y + 1e-6
+
+
+def test_layout_loose_and_cyclic_nodes():
+	assert layout([], []) == []
+	positions = layout([(100, 100)] * 3, [(0, 1, 0), (1, 0, 0)])
+	assert len(positions) == 3
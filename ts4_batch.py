@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import traceback
+
+# batch conversion farm - splits a folder of DAEs across N background blender processes
+# each worker runs the normal import_dae pipeline on its slice and saves one .blend per model,
+# so the output is exactly what an interactive import would give you
+#
+# coordinator (plain python or blender, doesn't need bpy):
+#   python ts4_batch.py --input exports/ --output blends/ --jobs 8
+# workers get started by the coordinator as:
+#   blender -b --factory-startup -P ts4_batch.py -- --worker --report report.json --output blends/ a.dae b.dae ...
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def find_daes(path):
+	if os.path.isfile(path):
+		return [path]
+	return sorted(os.path.join(path, filename) for filename in os.listdir(path) if filename.lower().endswith('.dae'))
+
+
+# biggest files first, dealt out round robin so every worker gets a similar amount of work
+def split_jobs(filepaths, jobs):
+	filepaths = sorted(filepaths, key=os.path.getsize, reverse=True)
+	return [filepaths[i::jobs] for i in range(jobs) if filepaths[i::jobs]]
+
+
+def default_blender():
+	if 'bpy' in sys.modules:
+		return sys.modules['bpy'].app.binary_path
+	return os.environ.get('BLENDER', 'blender')
+
+
+# starts the workers, waits for all of them and merges their reports
+# returns {'converted': [...], 'failed': [...], 'seconds': float}
+def run_batch(filepaths, output_dir, jobs=None, blender=None, merge=True):
+	jobs = jobs or os.cpu_count() or 1
+	blender = blender or default_blender()
+	filepaths = [os.path.abspath(filepath) for filepath in filepaths]
+	output_dir = os.path.abspath(output_dir)
+	os.makedirs(output_dir, exist_ok=True)
+	start = time.perf_counter()
+	workers = []
+	for index, chunk in enumerate(split_jobs(filepaths, jobs)):
+		report = os.path.join(output_dir, f'worker_{index}.json')
+		log = open(os.path.join(output_dir, f'worker_{index}.log'), 'w')
+		command = [
+			blender, '-b', '--factory-startup', '-P', os.path.join(script_dir, 'ts4_batch.py'), '--',
+			'--worker', '--report', report, '--output', output_dir, *([] if merge else ['--no-merge']), *chunk,
+		]
+		process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+		workers.append((process, chunk, report, log))
+	converted = []
+	failed = []
+	for process, chunk, report, log in workers:
+		process.wait()
+		log.close()
+		results = []
+		if os.path.exists(report):
+			with open(report) as file:
+				results = json.load(file)
+			os.remove(report)
+		done = {result['filepath'] for result in results}
+		for result in results:
+			(failed if result['error'] else converted).append(result)
+		# anything missing from the report means the worker died before getting to it
+		for filepath in chunk:
+			if filepath not in done:
+				failed.append({'filepath': filepath, 'output': None, 'seconds': 0, 'error': f'worker exited with code {process.returncode}, see {log.name}'})
+	summary = {'converted': converted, 'failed': failed, 'seconds': time.perf_counter() - start}
+	with open(os.path.join(output_dir, 'batch_report.json'), 'w') as file:
+		json.dump(summary, file, indent=2)
+	return summary
+
+
+# runs inside background blender - one clean scene per model so every .blend only has that sim
+def run_worker(filepaths, output_dir, report, merge=True):
+	import bpy
+	if script_dir not in sys.path:
+		sys.path.append(script_dir)
+	import ts4_core
+	import ts4_dae_import
+	results = []
+	# the next few models' files are read in the background while this one is built
+	prefetcher = ts4_core.Prefetcher(filepaths)
+	for filepath in filepaths:
+		start = time.perf_counter()
+		name = bpy.path.display_name_from_filepath(filepath)
+		output = os.path.join(output_dir, f'{name}.blend')
+		error = None
+		try:
+			bpy.ops.wm.read_factory_settings(use_empty=True)
+			ts4_dae_import.import_dae(filepath, merge, read=prefetcher.read)
+			# absolute texture paths, the .blend gets appended from somewhere else
+			bpy.ops.wm.save_as_mainfile(filepath=output, relative_remap=False)
+		except Exception:
+			error = traceback.format_exc()
+			print(error)
+			output = None
+		results.append({'filepath': filepath, 'output': output, 'seconds': time.perf_counter() - start, 'error': error})
+		# written after every model so a crash part way through still leaves a usable report
+		with open(report, 'w') as file:
+			json.dump(results, file)
+	prefetcher.close()
+	return results
+
+
+def parse_args(argv):
+	parser = argparse.ArgumentParser(description='Convert TS4SimRipper DAE exports to .blend files in parallel')
+	parser.add_argument('--input', help='a .dae file or a folder of them')
+	parser.add_argument('--output', required=True, help='folder to write the .blend files to')
+	parser.add_argument('--jobs', type=int, default=None, help='number of blender processes, defaults to the number of cores')
+	parser.add_argument('--blender', default=None, help='path to the blender executable')
+	parser.add_argument('--no-merge', action='store_true', help="don't merge vertices")
+	parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+	parser.add_argument('--report', help=argparse.SUPPRESS)
+	parser.add_argument('files', nargs='*', help=argparse.SUPPRESS)
+	return parser.parse_args(argv)
+
+
+def main(argv):
+	args = parse_args(argv)
+	if args.worker:
+		run_worker(args.files, args.output, args.report, not args.no_merge)
+		return 0
+	summary = run_batch(find_daes(args.input), args.output, args.jobs, args.blender, not args.no_merge)
+	print(f'converted {len(summary["converted"])}, failed {len(summary["failed"])} in {summary["seconds"]:.1f}s')
+	for result in summary['failed']:
+		print(f'failed: {result["filepath"]}')
+	return 1 if summary['failed'] else 0
+
+
+# blender hands our arguments over after '--'
+if __name__ == '__main__':
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+	sys.exit(main(argv))
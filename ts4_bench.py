@@ -0,0 +1,179 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+# headless import benchmark
+# imports every DAE in a background blender with ts4_stats turned on and reports models/min, verts/sec and peak RSS
+# results are saved as json in the results folder so runs can be compared against each other
+#   python ts4_bench.py --generate 10 --vertices 60000 --duplicates 0.1 --label weld-rewrite
+#   python ts4_bench.py --input exports/ --compare bench_results/20261018-101500_baseline.json
+# with no --compare the newest earlier result in the results folder is used
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+	sys.path.append(script_dir)
+from ts4_batch import default_blender
+
+# metrics compared between runs, and whether bigger is better
+METRICS = {
+	'models_per_minute': True,
+	'vertices_per_second': True,
+	'seconds': False,
+	'peak_rss': False,
+}
+
+
+def _git_commit():
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=script_dir, capture_output=True, text=True).stdout.strip()
+	except OSError:
+		return ''
+
+
+# runs the worker, then boils its report and the per-model stats down to one result
+def run_benchmark(filepaths, blender=None, label=''):
+	blender = blender or default_blender()
+	with tempfile.TemporaryDirectory() as temp:
+		report = os.path.join(temp, 'report.json')
+		stats = os.path.join(temp, 'stats.jsonl')
+		command = [
+			blender, '-b', '--factory-startup', '-P', os.path.join(script_dir, 'ts4_bench.py'), '--',
+			'--worker', '--report', report, '--stats', stats, *filepaths,
+		]
+		process = subprocess.run(command, capture_output=True, text=True)
+		if not os.path.exists(report):
+			raise RuntimeError(f'benchmark worker failed with code {process.returncode}:\n{process.stdout[-2000:]}{process.stderr[-2000:]}')
+		with open(report) as file:
+			worker = json.load(file)
+		records = []
+		if os.path.exists(stats):
+			with open(stats) as file:
+				records = [json.loads(line) for line in file if line.strip()]
+
+	imported = [model for model in worker['models'] if not model['error']]
+	seconds = sum(model['seconds'] for model in imported)
+	vertices = sum(record['counters'].get('vertices', 0) for record in records)
+	stages = {}
+	for record in records:
+		for name, stage in record['stages'].items():
+			stages[name] = stages.get(name, 0.0) + stage['seconds']
+	return {
+		'label': label,
+		'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+		'commit': _git_commit(),
+		'blender': worker['blender'],
+		'models': len(imported),
+		'failed': [model['filepath'] for model in worker['models'] if model['error']],
+		'seconds': seconds,
+		'vertices': vertices,
+		'models_per_minute': len(imported) / seconds * 60 if seconds else 0.0,
+		'vertices_per_second': vertices / seconds if seconds else 0.0,
+		'peak_rss': worker['peak_rss'],
+		'stages': stages,
+		'per_model': records,
+	}
+
+
+# runs inside background blender, one fresh scene per model so earlier models don't skew later ones
+def run_worker(filepaths, report, stats):
+	import bpy
+	import ts4_stats
+	import ts4_dae_import
+	ts4_stats.enabled = True
+	ts4_stats.output = stats
+	models = []
+	for filepath in filepaths:
+		bpy.ops.wm.read_factory_settings(use_empty=True)
+		start = time.perf_counter()
+		error = None
+		try:
+			ts4_dae_import.import_dae(filepath)
+		except Exception as exception:
+			error = repr(exception)
+			print(f'{filepath} failed: {error}')
+		models.append({'filepath': filepath, 'seconds': time.perf_counter() - start, 'error': error})
+	with open(report, 'w') as file:
+		json.dump({'blender': bpy.app.version_string, 'models': models, 'peak_rss': ts4_stats.peak_memory()}, file)
+
+
+def save_result(result, results_dir):
+	os.makedirs(results_dir, exist_ok=True)
+	label = f'_{result["label"]}' if result['label'] else ''
+	path = os.path.join(results_dir, f'{time.strftime("%Y%m%d-%H%M%S")}{label}.json')
+	with open(path, 'w') as file:
+		json.dump(result, file, indent=2)
+	return path
+
+
+def latest_result(results_dir, exclude=None):
+	paths = sorted(path for path in glob.glob(os.path.join(results_dir, '*.json')) if path != exclude)
+	return paths[-1] if paths else None
+
+
+def print_result(result):
+	print(f'{result["models"]} models, {result["vertices"]} vertices in {result["seconds"]:.2f}s')
+	print(f'  {result["models_per_minute"]:.1f} models/min, {result["vertices_per_second"]:.0f} verts/sec, peak RSS {result["peak_rss"] / 2**20:.0f} MB')
+	for name, seconds in sorted(result['stages'].items(), key=lambda stage: -stage[1]):
+		print(f'  {name:>14}: {seconds:.3f}s')
+	for filepath in result['failed']:
+		print(f'  failed: {filepath}')
+
+
+def compare(result, previous):
+	print(f'compared to {previous["label"] or previous["time"]} ({previous["commit"]}):')
+	for metric, higher_is_better in METRICS.items():
+		old, new = previous.get(metric, 0), result.get(metric, 0)
+		if not old:
+			continue
+		change = (new - old) / old * 100
+		better = (change > 0) == higher_is_better
+		print(f'  {metric:>20}: {old:.4g} -> {new:.4g} ({change:+.1f}%{", better" if better and change else ""})')
+
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='Benchmark importing TS4 DAE files in background blender')
+	parser.add_argument('--input', help='folder of .dae files to import')
+	parser.add_argument('--generate', type=int, default=0, help='import this many synthetic models instead of --input')
+	parser.add_argument('--vertices', type=int, default=60000, help='vertices per synthetic model')
+	parser.add_argument('--duplicates', type=float, default=0.1, help='fraction of synthetic vertices that are doubles')
+	parser.add_argument('--glass', action='store_true', help='give synthetic models glass meshes')
+	parser.add_argument('--results', default=os.path.join(script_dir, 'bench_results'), help='folder results are saved to')
+	parser.add_argument('--label', default='', help='name for this run')
+	parser.add_argument('--compare', default=None, help='result file to compare against, defaults to the newest one')
+	parser.add_argument('--blender', default=None, help='path to the blender executable')
+	parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+	parser.add_argument('--report', help=argparse.SUPPRESS)
+	parser.add_argument('--stats', help=argparse.SUPPRESS)
+	parser.add_argument('files', nargs='*', help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+	if args.worker:
+		run_worker(args.files, args.report, args.stats)
+		return 0
+
+	with tempfile.TemporaryDirectory() as temp:
+		if args.generate:
+			import ts4_synth
+			filepaths = ts4_synth.write_models(temp, args.generate, args.vertices, args.duplicates, args.glass)
+		else:
+			filepaths = sorted(glob.glob(os.path.join(args.input, '*.dae')))
+		result = run_benchmark(filepaths, args.blender, args.label)
+	result['settings'] = {key: value for key, value in vars(args).items() if key in ('input', 'generate', 'vertices', 'duplicates', 'glass')}
+	print_result(result)
+	previous = args.compare or latest_result(args.results)
+	path = save_result(result, args.results)
+	if previous:
+		with open(previous) as file:
+			compare(result, json.load(file))
+	print(f'saved {path}')
+	return 1 if result['failed'] else 0
+
+
+# blender hands our arguments over after '--'
+if __name__ == '__main__':
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+	sys.exit(main(argv))
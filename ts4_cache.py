@@ -0,0 +1,105 @@
+import os
+import hashlib
+import bpy
+
+from ts4_core import image_paths, read_image_paths
+
+# content addressed cache of finished imports
+# the key is a hash of the dae, every png it uses and the importer settings, the value is a .blend with the
+# finished rig, meshes and materials - a hit appends (or links) that instead of parsing and rebuilding
+# TS4_CACHE_DIR moves the cache, TS4_CACHE_SIZE sets the size limit in MB, oldest-used files go first
+
+# bump this whenever the importer's output changes so old entries stop matching
+CACHE_VERSION = 6
+
+directory = os.environ.get('TS4_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'ts4_dae_import')
+size_limit = int(os.environ.get('TS4_CACHE_SIZE', 2048)) * 2**20
+
+
+def _hash_file(hasher, path):
+	with open(path, 'rb') as file:
+		for block in iter(lambda: file.read(2**20), b''):
+			hasher.update(block)
+
+
+# data is the dae's bytes if they're already in memory (see Prefetcher.peek), otherwise the file is hashed in
+# blocks and scanned for textures through a memory map so it never has to be read in whole
+def cache_key(filepath, settings, data=None):
+	hasher = hashlib.blake2b(digest_size=20)
+	hasher.update(repr((CACHE_VERSION, sorted(settings.items()))).encode())
+	if data is not None:
+		hasher.update(data)
+		paths = image_paths(filepath, data)
+	else:
+		_hash_file(hasher, filepath)
+		paths = read_image_paths(filepath)
+	for path in paths:
+		# a missing texture is part of the key too, the import comes out different without it
+		hasher.update(path.encode())
+		if os.path.exists(path):
+			_hash_file(hasher, path)
+	return hasher.hexdigest()
+
+
+def entry_path(key):
+	return os.path.join(directory, f'{key}.blend')
+
+
+# returns the cached .blend for key or None, and marks it as recently used
+def lookup(key):
+	path = entry_path(key)
+	if not os.path.exists(path):
+		return None
+	os.utime(path)
+	return path
+
+
+# writes the objects and everything they use into the cache, then trims it back under the size limit
+def store(key, objects):
+	os.makedirs(directory, exist_ok=True)
+	path = entry_path(key)
+	temp = f'{path}.tmp'
+	# absolute paths so the textures still resolve from inside the cache folder
+	bpy.data.libraries.write(temp, set(objects), path_remap='ABSOLUTE', fake_user=True, compress=True)
+	os.replace(temp, path)
+	evict()
+	return path
+
+
+# appends (or links) every object in a cached .blend into collection, returns the objects
+def load(path, collection, link=False):
+	with bpy.data.libraries.load(path, link=link) as (data_from, data_to):
+		data_to.objects = data_from.objects
+	objects = [obj for obj in data_to.objects if obj is not None]
+	for obj in objects:
+		collection.objects.link(obj)
+		# fake users were only there to keep the objects in the cache file
+		if not link:
+			obj.use_fake_user = False
+	return objects
+
+
+# least recently used entries go first until the cache fits in size_limit
+def evict(limit=None):
+	limit = size_limit if limit is None else limit
+	if not os.path.isdir(directory):
+		return 0
+	entries = []
+	for filename in os.listdir(directory):
+		if filename.endswith('.blend'):
+			stat = os.stat(os.path.join(directory, filename))
+			entries.append((stat.st_mtime, stat.st_size, filename))
+	entries.sort()
+	total = sum(size for mtime, size, filename in entries)
+	removed = 0
+	for mtime, size, filename in entries:
+		if total <= limit:
+			break
+		os.remove(os.path.join(directory, filename))
+		total -= size
+		removed += 1
+	return removed
+
+
+def clear():
+	return evict(0)
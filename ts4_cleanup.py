@@ -0,0 +1,85 @@
+import bpy
+
+# end of import cleanup
+# snapshot() before an import, sweep() after it - only datablocks that weren't there at the snapshot get touched,
+# so nothing the user made or imported earlier is ever removed
+# sweep() drops lights and cameras that came in with the model, then everything new that nothing uses,
+# and reports roughly how many bytes of image and mesh data that freed
+
+# the kinds of datablocks an import can leave behind
+COLLECTIONS = ('objects', 'meshes', 'materials', 'images', 'armatures', 'lights', 'cameras', 'node_groups', 'actions')
+
+
+class Sweep:
+	def __init__(self):
+		self.removed = {}
+		self.image_bytes = 0
+		self.mesh_bytes = 0
+
+	@property
+	def freed_bytes(self):
+		return self.image_bytes + self.mesh_bytes
+
+	def __str__(self):
+		removed = ', '.join(f'{count} {kind}' for kind, count in sorted(self.removed.items())) or 'nothing'
+		return f'removed {removed}, freed {self.image_bytes / 2**20:.1f} MB of images and {self.mesh_bytes / 2**20:.1f} MB of meshes'
+
+
+# pointers of every datablock in the file, per collection
+def snapshot():
+	return {name: {id.as_pointer() for id in getattr(bpy.data, name)} for name in COLLECTIONS}
+
+
+def image_bytes(image):
+	if not image.has_data:
+		return 0
+	width, height = image.size
+	return width * height * image.channels * (4 if image.is_float else 1)
+
+
+# close enough to what blender keeps per element, it doesn't report the real number
+def mesh_bytes(mesh):
+	loops = len(mesh.loops)
+	return len(mesh.vertices) * 12 + len(mesh.edges) * 8 + loops * 8 + len(mesh.polygons) * 8 + loops * 8 * len(mesh.uv_layers)
+
+
+def _new(before, name):
+	return [id for id in getattr(bpy.data, name) if id.as_pointer() not in before[name]]
+
+
+# hidden datablocks like the .ts4_template materials are meant to hang around without users
+def _orphan(id):
+	return id.users == 0 and not id.use_fake_user and not id.name.startswith('.')
+
+
+def _remove(sweep, name, id):
+	if name == 'images':
+		sweep.image_bytes += image_bytes(id)
+	elif name == 'meshes':
+		sweep.mesh_bytes += mesh_bytes(id)
+	getattr(bpy.data, name).remove(id)
+	sweep.removed[name] = sweep.removed.get(name, 0) + 1
+
+
+def sweep(before):
+	result = Sweep()
+	for obj in _new(before, 'objects'):
+		if obj.type in ('LIGHT', 'CAMERA'):
+			_remove(result, 'objects', obj)
+	# removing a material can orphan its images and so on, so go round until a pass finds nothing
+	removed = True
+	while removed:
+		removed = False
+		for name in COLLECTIONS:
+			for id in _new(before, name):
+				if _orphan(id):
+					_remove(result, name, id)
+					removed = True
+	return result
+
+
+# throws away everything made since the snapshot, for an import that failed part way through
+def discard(before):
+	for obj in _new(before, 'objects'):
+		bpy.data.objects.remove(obj)
+	return sweep(before)
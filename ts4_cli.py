@@ -0,0 +1,120 @@
+import os
+import sys
+import argparse
+import tempfile
+import traceback
+
+import bpy
+
+# headless entry point - imports a folder of TS4SimRipper exports into one .blend, no UI needed
+#   blender -b -P ts4_cli.py -- --input exports/ --output household.blend [--no-merge] [--no-cache] [--jobs N]
+# with --jobs above 1 the models are converted in parallel by ts4_batch workers and appended into the output,
+# ending up the same as a serial import - shared textures, armatures and meshes, the same names, the same cache
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+	sys.path.append(script_dir)
+import ts4_batch
+import ts4_cache
+import ts4_core
+import ts4_dae_import
+import ts4_names
+import ts4_textures
+
+
+def new_file():
+	bpy.ops.wm.read_factory_settings(use_empty=True)
+	return bpy.context.scene.collection
+
+
+# imports everything in this process, returns {filepath: error}
+def import_serial(filepaths, merge, collection, use_cache=True):
+	failed = {}
+	names = ts4_names.NameRegistry()
+	# the next few models' files are read in the background while this one is built
+	with ts4_core.Prefetcher(filepaths) as prefetcher:
+		for filepath in filepaths:
+			try:
+				if use_cache:
+					ts4_dae_import.import_cached(filepath, merge, collection, read=prefetcher.read, names=names, data=prefetcher.peek(filepath))
+				else:
+					ts4_dae_import.import_dae(filepath, merge, collection, read=prefetcher.read, names=names)
+			except Exception:
+				failed[filepath] = traceback.format_exc()
+				print(failed[filepath])
+			# cache hits never read, so carry on reading ahead past them
+			prefetcher.done(filepath)
+	ts4_textures.evict_unused()
+	return failed
+
+
+# converts the models on N workers then appends them from the workers' .blend files, returns {filepath: error}
+# cache hits are loaded straight from the cache and only the rest go to the workers, which fill it in
+# each appended model goes through adopt_model, so it shares textures, armature and meshes with the models
+# before it and gets the same names a serial import would have given it
+def import_parallel(filepaths, merge, collection, jobs, blender=None, use_cache=True):
+	failed = {}
+	names = ts4_names.NameRegistry()
+	keys = {}
+	misses = []
+	for filepath in filepaths:
+		if use_cache:
+			key = keys[filepath] = ts4_cache.cache_key(filepath, {'merge': merge})
+			if ts4_cache.lookup(key) is not None:
+				try:
+					ts4_dae_import.import_cached(filepath, merge, collection, names=names, key=key)
+				except Exception:
+					failed[filepath] = traceback.format_exc()
+					print(failed[filepath])
+				continue
+		misses.append(filepath)
+	if misses:
+		with tempfile.TemporaryDirectory() as temp:
+			summary = ts4_batch.run_batch(misses, temp, jobs, blender, merge)
+			order = {filepath: index for index, filepath in enumerate(misses)}
+			for result in sorted(summary['converted'], key=lambda result: order[result['filepath']]):
+				filepath = result['filepath']
+				try:
+					objects = ts4_cache.load(result['output'], collection)
+					ts4_dae_import.adopt_model(names, bpy.path.display_name_from_filepath(filepath), objects)
+				except Exception:
+					failed[filepath] = traceback.format_exc()
+					print(failed[filepath])
+					continue
+				if use_cache:
+					try:
+						ts4_cache.store(keys[filepath], objects)
+					except (OSError, RuntimeError) as error:
+						print(f'could not write import cache: {error}')
+			failed.update({result['filepath']: result['error'] for result in summary['failed']})
+	ts4_textures.evict_unused()
+	return failed
+
+
+def main(argv):
+	parser = argparse.ArgumentParser(prog='blender -b -P ts4_cli.py --', description='Import TS4SimRipper DAE exports into a .blend file')
+	parser.add_argument('--input', required=True, help='a .dae file or a folder of them')
+	parser.add_argument('--output', required=True, help='.blend file to save')
+	parser.add_argument('--no-merge', action='store_true', help="don't merge vertices")
+	parser.add_argument('--no-cache', action='store_true', help="don't use or fill the import cache")
+	parser.add_argument('--jobs', type=int, default=1, help='number of blender processes to convert with')
+	parser.add_argument('--blender', default=None, help='blender executable for the workers, defaults to this one')
+	args = parser.parse_args(argv)
+
+	filepaths = [os.path.abspath(filepath) for filepath in ts4_batch.find_daes(args.input)]
+	collection = new_file()
+	if args.jobs > 1 and len(filepaths) > 1:
+		failed = import_parallel(filepaths, not args.no_merge, collection, args.jobs, args.blender, not args.no_cache)
+	else:
+		failed = import_serial(filepaths, not args.no_merge, collection, not args.no_cache)
+	bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.output))
+	print(f'imported {len(filepaths) - len(failed)} of {len(filepaths)} models into {args.output}')
+	for filepath in failed:
+		print(f'failed: {filepath}')
+	return 1 if failed else 0
+
+
+# blender hands our arguments over after '--'
+if __name__ == '__main__':
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+	sys.exit(main(argv))
@@ -0,0 +1,251 @@
+import math
+import hashlib
+
+import numpy as np
+import bpy
+from mathutils import Matrix
+
+import ts4_core
+import ts4_mesh
+import ts4_textures
+
+# blender side of the importer - builds the rig, meshes and materials out of a ts4_core.DaeScene
+# parsing and the array work happen in ts4_core, this is just the part that needs bpy
+
+
+# rest pose is rounded to this before fingerprinting so float noise between exports doesn't split rigs
+SKELETON_TOLERANCE = 1e-4
+
+# length of newly created bones, TS4 joints don't carry a length so this just keeps them visible
+BONE_LENGTH = 0.05
+
+
+def _matrix(array):
+	return Matrix(np.asarray(array).tolist())
+
+
+# builds the rig, meshes and materials from a DaeScene and links them into collection
+# returns (rig, meshes) - meshes are sorted by name so the glass layer comes second like it did with collada_import
+# selection and the active object aren't touched, callers decide what to do with those
+def build_scene(dae, collection):
+	joints, meshes = ts4_core.walk(dae)
+	joints = [(node, _matrix(matrix), parent) for node, matrix, parent in joints]
+	rig = build_armature(joints, collection)
+	# collada is Y up by default, blender is Z up
+	if dae.up_axis == 'Y_UP':
+		rig.matrix_world = Matrix.Rotation(math.radians(90), 4, 'X')
+	elif dae.up_axis == 'X_UP':
+		rig.matrix_world = Matrix.Rotation(math.radians(90), 4, 'Z')
+	bone_names = ts4_core.bone_names(joints)
+	materials = {}
+	objects = []
+	for node, matrix in meshes:
+		obj = build_mesh_object(dae, node, collection, materials, bone_names)
+		if obj is None:
+			continue
+		obj.parent = rig
+		obj.matrix_basis = _matrix(matrix)
+		modifier = obj.modifiers.new('Armature', 'ARMATURE')
+		modifier.object = rig
+		objects.append(obj)
+	objects.sort(key=lambda obj: obj.name)
+	return rig, objects
+
+
+# rigs with the same skeleton share one Armature datablock, only the objects (and their poses) are per sim
+# every adult sim has the same skeleton, so a household only builds it once
+def build_armature(joints, collection):
+	fingerprint = skeleton_fingerprint(joints)
+	armature = find_armature(fingerprint) if joints else None
+	if armature is not None:
+		rig = bpy.data.objects.new('Armature', armature)
+		collection.objects.link(rig)
+		return rig
+	armature = bpy.data.armatures.new('Armature')
+	rig = bpy.data.objects.new('Armature', armature)
+	collection.objects.link(rig)
+	if not joints:
+		return rig
+	# edit bones are the only way to make bones and there's no way into edit mode without mode_set,
+	# so this is the one operator left - the rig is only active inside the override
+	# entering edit mode takes every selected armature in the view layer along (like the rigs imported earlier
+	# in a batch), whatever the override says, so they're deselected for the length of it and selected again after
+	view_layer = bpy.context.view_layer
+	selected = [obj for obj in view_layer.objects.selected if obj != rig]
+	for obj in selected:
+		obj.select_set(False)
+	try:
+		_build_bones(rig, armature, joints)
+	finally:
+		for obj in selected:
+			obj.select_set(True)
+	armature['ts4_skeleton'] = fingerprint
+	return rig
+
+
+def _build_bones(rig, armature, joints):
+	with bpy.context.temp_override(active_object=rig, object=rig, selected_objects=[rig], selected_editable_objects=[rig]):
+		bpy.ops.object.mode_set(mode='EDIT')
+		edit_bones = armature.edit_bones
+		for node, matrix, parent in joints:
+			bone = edit_bones.new(node.name)
+			bone.head = (0, 0, 0)
+			bone.tail = (0, BONE_LENGTH, 0)
+			# drop any scale so the bone keeps its length, setting matrix moves head/tail and sets roll
+			location, rotation, scale = matrix.decompose()
+			bone.matrix = Matrix.LocRotScale(location, rotation, None)
+			if parent is not None:
+				bone.parent = edit_bones.get(parent.name)
+		bpy.ops.object.mode_set(mode='OBJECT')
+
+
+# hash of the bone names, hierarchy and rest pose - anything that would make a different armature
+def skeleton_fingerprint(joints):
+	hasher = hashlib.blake2b(digest_size=16)
+	for node, matrix, parent in joints:
+		hasher.update(f'{node.name}|{parent.name if parent is not None else ""}|'.encode())
+		location, rotation, scale = matrix.decompose()
+		rest = np.array([*location, *rotation], dtype=np.float64)
+		hasher.update(np.round(rest / SKELETON_TOLERANCE).astype(np.int64).tobytes())
+	return hasher.hexdigest()
+
+
+# an armature built earlier from the same skeleton (other than exclude), or None
+# linked armatures are skipped since their bones can't be relied on to stay put
+def find_armature(fingerprint, exclude=None):
+	for armature in bpy.data.armatures:
+		if armature != exclude and armature.library is None and armature.get('ts4_skeleton') == fingerprint:
+			return armature
+	return None
+
+
+# points a rig that was appended from another .blend at the file's armature for the same skeleton, if it has one,
+# and removes its own copy - returns True if the armature was swapped
+def share_armature(rig):
+	armature = rig.data
+	fingerprint = armature.get('ts4_skeleton')
+	if fingerprint is None or armature.library is not None:
+		return False
+	existing = find_armature(fingerprint, armature)
+	if existing is None:
+		return False
+	rig.data = existing
+	if armature.users == 0:
+		bpy.data.armatures.remove(armature)
+	return True
+
+
+def build_mesh_object(dae, node, collection, materials, bone_names):
+	controller, geometry = ts4_core.node_geometry(dae, node)
+	if geometry is None:
+		print(f'no geometry found for {node.name}, skipping')
+		return None
+	slots, used = ts4_core.material_slots(node, geometry)
+	# materials are shared between meshes in the same file, built once per material id
+	for material_id in used:
+		if material_id not in materials:
+			materials[material_id] = build_material(dae, material_id)
+	bind_shape = controller.bind_shape_matrix if controller else None
+	mesh = build_mesh(geometry, bind_shape, slots)
+	for material_id in used:
+		mesh.materials.append(materials[material_id])
+	obj = bpy.data.objects.new(node.name, mesh)
+	collection.objects.link(obj)
+	# lets rebuild_meshes find this object again after the dae is re-exported
+	obj['ts4_node'] = node.id
+	if controller is not None:
+		build_skin(obj, controller, bone_names)
+	return obj
+
+
+# rebuilds the mesh data of objects from an earlier build_scene out of a new read of the same file
+# objects is {node id: object}, the objects themselves (modifiers, materials, rig and pose) are kept
+# returns the objects that were updated
+def rebuild_meshes(dae, objects):
+	joints, meshes = ts4_core.walk(dae)
+	bone_names = ts4_core.bone_names(joints)
+	updated = []
+	for node, matrix in meshes:
+		obj = objects.get(node.id)
+		if obj is not None and rebuild_mesh(dae, node, obj, bone_names):
+			updated.append(obj)
+	return updated
+
+
+# swaps a freshly built mesh into obj - a new datablock rather than refilling the old one,
+# since the old one might be shared with another sim's object
+def rebuild_mesh(dae, node, obj, bone_names):
+	controller, geometry = ts4_core.node_geometry(dae, node)
+	if geometry is None:
+		return False
+	slots, used = ts4_core.material_slots(node, geometry)
+	old = obj.data
+	mesh = build_mesh(geometry, controller.bind_shape_matrix if controller else None, slots)
+	for material in old.materials:
+		mesh.materials.append(material)
+	obj.data = mesh
+	if controller is not None:
+		build_skin(obj, controller, bone_names)
+	name = old.name
+	if old.users == 0:
+		bpy.data.meshes.remove(old)
+	mesh.name = name
+	return True
+
+
+def build_mesh(geometry, bind_shape=None, slots=None):
+	mesh = bpy.data.meshes.new(geometry.name)
+	arrays = ts4_core.mesh_arrays(geometry, bind_shape, slots)
+	if arrays is None:
+		return mesh
+	ts4_mesh.fill_mesh(mesh, **arrays)
+	return mesh
+
+
+def build_material(dae, material_id):
+	if material_id not in dae.materials:
+		return None
+	name, effect_id = dae.materials[material_id]
+	effect = dae.effects.get(effect_id, {})
+	material = new_material(name)
+	nodes = material.node_tree.nodes
+	nodes.get('Image Texture').image = load_image(dae, effect.get('diffuse'))
+	nodes.get('Image Texture.001').image = load_image(dae, effect.get('specular'))
+	if isinstance(effect.get('ambient'), tuple):
+		nodes.get('RGB').outputs['Color'].default_value = (effect['ambient'] + (1.0,) * 4)[:4]
+	return material
+
+
+# same nodes collada_import made so config_shaders still finds them by name
+# Image Texture = base color, Image Texture.001 = specular, RGB = ambient
+def new_material(name):
+	material = bpy.data.materials.new(name)
+	material.use_nodes = True
+	tree = material.node_tree
+	nodes = tree.nodes
+	bsdf = nodes.get('Principled BSDF')
+	color = nodes.new('ShaderNodeTexImage')
+	color.location = (bsdf.location.x - 400, bsdf.location.y)
+	tree.links.new(bsdf.inputs['Base Color'], color.outputs['Color'])
+	specular = nodes.new('ShaderNodeTexImage')
+	specular.location = (color.location.x, color.location.y - 300)
+	ambient = nodes.new('ShaderNodeRGB')
+	ambient.location = (bsdf.location.x, bsdf.location.y + 200)
+	return material
+
+
+def load_image(dae, image_id):
+	if not isinstance(image_id, str) or image_id not in dae.images:
+		return None
+	return ts4_textures.load_image(dae.images[image_id])
+
+
+# one group per joint, weights go in as batches of vertices that share a (joint, weight) pair
+def build_skin(obj, controller, bone_names):
+	if controller.vcount is None or controller.v is None or controller.weights is None:
+		return
+	names = [bone_names.get(joint, joint) for joint in controller.joints]
+	# groups already on the object are reused so rebuild_mesh doesn't end up with .001 copies
+	groups = [obj.vertex_groups.get(name) or obj.vertex_groups.new(name=name) for name in names]
+	vertices, joints, weights = ts4_core.skin_weights(controller)
+	ts4_mesh.write_vertex_weights(groups, vertices, joints, weights)
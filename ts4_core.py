@@ -0,0 +1,915 @@
+import os
+import re
+import html
+import math
+import mmap
+import threading
+from urllib.parse import unquote
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+# everything the importer does that doesn't need blender - no bpy or mathutils in here
+# dae parsing, finding files and textures, TSR's naming rules and the numpy side of meshes and skins
+# ts4_collada is the blender adapter that turns what comes out of here into datablocks
+# because it's plain python, parsing can run in worker processes (DaePool) and all of it works outside blender
+#
+# our own COLLADA reader - replaces bpy.ops.wm.collada_import for TS4SimRipper exports
+# the file is streamed with iterparse so big <float_array>/<p> blocks get turned into numpy arrays
+# as soon as they're closed and the xml text is thrown away, instead of holding a whole DOM in memory
+# only the parts TSR actually writes are handled: geometry, skin controllers, joints, materials and images
+# lights and cameras are skipped entirely so there's no stray light to clean up afterwards
+
+
+COLLADA_NS = '{http://www.collada.org/2005/11/COLLADASchema}'
+
+# TS4 never uses more than 4 bones per vertex
+MAX_INFLUENCES = 4
+# normalized weights get rounded to this so lots of vertices share each weight and go into VertexGroup.add together
+WEIGHT_STEP = 1 / 1024
+
+# blocks that get decoded straight into arrays when they close
+FLOAT_TAGS = {'float_array'}
+INT_TAGS = {'p', 'v', 'vcount'}
+NAME_TAGS = {'Name_array', 'IDREF_array'}
+
+# number blocks are cut out of the xml before the parser sees them and decoded straight from the file
+# the parser gets '#n' instead, the index of the decoded array, so it never holds the text
+BLOCK = re.compile(rb'<(float_array|p|v|vcount)(\s[^>]*)?>')
+COUNT = re.compile(rb'count="(\d+)"')
+# bytes handed to numpy (and the xml parser) at a time, so no copy of the file is ever bigger than this
+CHUNK = 2**20
+WHITESPACE = (b' ', b'\t', b'\r', b'\n')
+
+
+class DaeGeometry:
+	def __init__(self, id, name):
+		self.id = id
+		self.name = name
+		# source id -> (array reshaped to stride, stride)
+		self.sources = {}
+		# <vertices> id -> POSITION source id
+		self.vertices = {}
+		self.primitives = []
+
+
+class DaePrimitive:
+	def __init__(self, material, count):
+		self.material = material
+		self.count = count
+		# list of (semantic, source id, offset, set)
+		self.inputs = []
+		self.p = None
+		# only polylists have vcount, triangles are always 3
+		self.vcount = None
+
+
+class DaeController:
+	def __init__(self, id, name, geometry):
+		self.id = id
+		self.name = name
+		self.geometry = geometry
+		self.bind_shape_matrix = None
+		self.joints = []
+		self.inv_bind_matrices = None
+		self.weights = None
+		self.vcount = None
+		self.v = None
+		self.joint_offset = 0
+		self.weight_offset = 1
+		self.stride = 2
+
+
+class DaeNode:
+	def __init__(self, id, name, sid, type):
+		self.id = id
+		self.name = name
+		self.sid = sid
+		self.type = type
+		self.matrix = np.identity(4)
+		self.children = []
+		self.controller = None
+		self.geometry = None
+		# material symbol -> material id
+		self.bindings = {}
+
+
+class DaeScene:
+	def __init__(self, filepath):
+		self.filepath = filepath
+		self.directory = os.path.dirname(os.path.abspath(filepath))
+		self.up_axis = 'Y_UP'
+		# image id -> file path
+		self.images = {}
+		# effect id -> {'diffuse': image id, 'specular': image id, 'ambient': color}
+		self.effects = {}
+		# material id -> (name, effect id)
+		self.materials = {}
+		self.geometries = {}
+		self.controllers = {}
+		# top level nodes of the visual scene
+		self.nodes = []
+
+
+def _tag(elem):
+	return elem.tag[len(COLLADA_NS):] if elem.tag.startswith(COLLADA_NS) else elem.tag
+
+
+def _url(value):
+	return value[1:] if value and value.startswith('#') else value
+
+
+def _ns(path):
+	# 'mesh/source' -> '{ns}mesh/{ns}source'
+	return '/'.join(f'{COLLADA_NS}{part}' if part not in ('.', '..', '*') else part for part in path.split('/'))
+
+
+def _decode(tag, elem):
+	text = elem.text or ''
+	if tag in FLOAT_TAGS:
+		return np.fromstring(text, dtype=np.float32, sep=' ')
+	if tag in INT_TAGS:
+		return np.fromstring(text, dtype=np.int32, sep=' ')
+	return text.split()
+
+
+# returns a DaeScene with everything we need to build the blender side
+# the file is memory mapped, data is its bytes instead if they've already been read (see Prefetcher)
+# filepath is still used for relative paths either way
+def read_dae(filepath, data=None):
+	if data is not None:
+		return _read_dae(filepath, data)
+	with open(filepath, 'rb') as file:
+		try:
+			mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			# empty files can't be mapped, let the parser complain about it
+			return _read_dae(filepath, b'')
+		with mapped:
+			return _read_dae(filepath, mapped)
+
+
+def _read_dae(filepath, data):
+	dae = DaeScene(filepath)
+	decoded = {}
+	blocks = []
+	handlers = {
+		'asset': _read_asset,
+		'image': _read_image,
+		'effect': _read_effect,
+		'material': _read_material,
+		'geometry': _read_geometry,
+		'controller': _read_controller,
+		'visual_scene': _read_visual_scene,
+	}
+	parser = ET.XMLPullParser(events=('start', 'end'))
+	# only clear library entries once they're read, nested elements are still needed by their parent handler
+	depth = 0
+
+	def handle_events():
+		nonlocal depth
+		for event, elem in parser.read_events():
+			if event == 'start':
+				depth += 1
+				continue
+			depth -= 1
+			tag = _tag(elem)
+			if (tag in FLOAT_TAGS or tag in INT_TAGS) and (elem.text or '').startswith('#'):
+				index = int(elem.text[1:])
+				decoded[elem] = blocks[index]
+				blocks[index] = None
+				elem.text = None
+			elif tag in FLOAT_TAGS or tag in INT_TAGS or tag in NAME_TAGS:
+				decoded[elem] = _decode(tag, elem)
+				elem.text = None
+			# library entries sit at depth 2 (COLLADA > library_x > entry), asset at depth 1
+			elif tag in handlers and depth <= 2:
+				handlers[tag](dae, elem, decoded)
+				for child in elem.iter():
+					decoded.pop(child, None)
+				elem.clear()
+
+	position = 0
+	released = 0
+	while True:
+		match = BLOCK.search(data, position)
+		# <float_array .../> has nothing to cut out
+		if match is not None and match.group(2) and match.group(2).endswith(b'/'):
+			_feed(parser, data, position, match.end())
+			position = match.end()
+			continue
+		close = data.find(b'</' + match.group(1) + b'>', match.end()) if match is not None else -1
+		if close < 0:
+			break
+		_feed(parser, data, position, match.end())
+		handle_events()
+		count = COUNT.search(match.group(2) or b'')
+		dtype = np.float32 if match.group(1) == b'float_array' else np.int32
+		parser.feed(f'#{len(blocks)}'.encode())
+		blocks.append(_decode_block(data, match.end(), close, dtype, int(count.group(1)) if count else None))
+		position = close
+		released = _release(data, released, position)
+	_feed(parser, data, position, len(data))
+	parser.close()
+	handle_events()
+	return dae
+
+
+# hands the mapped pages before end back to the os - they'd otherwise sit in the process's memory as if
+# the whole file had been loaded, even though nothing goes back to them
+def _release(data, start, end):
+	end -= end % mmap.PAGESIZE
+	if end > start and isinstance(data, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED'):
+		data.madvise(mmap.MADV_DONTNEED, start, end - start)
+		return end
+	return start
+
+
+def _feed(parser, data, start, end):
+	for offset in range(start, end, CHUNK):
+		parser.feed(data[offset:min(offset + CHUNK, end)])
+
+
+# decodes the whitespace separated numbers in data[start:end] a chunk at a time, straight into one array
+# float_array says how many values it has, <p> and friends get the most there could be (every other byte)
+# and are shrunk at the end - pages that never get written don't take up any memory
+# where to end a chunk near stop so no number gets cut in two - on the last whitespace before it,
+# or if there's none (one enormous token) on the first one after it
+def _split(data, start, stop, end):
+	cut = max(data.rfind(space, start, stop) for space in WHITESPACE)
+	if cut > start:
+		return cut
+	cuts = [cut for cut in (data.find(space, stop, end) for space in WHITESPACE) if cut != -1]
+	return min(cuts) if cuts else end
+
+
+def _decode_block(data, start, end, dtype, count=None):
+	out = np.empty(count if count is not None else (end - start + 1) // 2, dtype=dtype)
+	parts = []
+	filled = 0
+	while start < end:
+		stop = min(start + CHUNK, end)
+		if stop < end:
+			stop = _split(data, start, stop, end)
+		text = data[start:stop]
+		# numpy reads a run of nothing but whitespace as a 0
+		values = np.fromstring(text, dtype=dtype, sep=' ') if text and not text.isspace() else np.empty(0, dtype=dtype)
+		_release(data, start - start % mmap.PAGESIZE, stop)
+		start = stop
+		if out is not None and filled + len(values) <= len(out):
+			out[filled:filled + len(values)] = values
+			filled += len(values)
+			continue
+		# count was wrong, fall back to joining the pieces
+		if out is not None:
+			parts.append(out[:filled])
+			out = None
+		parts.append(values)
+	if out is not None:
+		if filled < len(out):
+			out.resize(filled, refcheck=False)
+		return out
+	return np.concatenate(parts)
+
+
+def _read_asset(dae, elem, decoded):
+	up_axis = elem.find(_ns('up_axis'))
+	if up_axis is not None and up_axis.text:
+		dae.up_axis = up_axis.text.strip()
+
+
+def _read_image(dae, elem, decoded):
+	init_from = elem.find(_ns('init_from'))
+	if init_from is None:
+		return
+	# newer files wrap the path in <ref>
+	ref = init_from.find(_ns('ref'))
+	path = (ref if ref is not None else init_from).text or ''
+	dae.images[elem.get('id')] = resolve_image_path(dae.directory, path)
+
+
+# an <init_from> path as it appears in the file -> the path on disk, relative ones are from the dae's folder
+def resolve_image_path(directory, path):
+	path = unquote(path.strip())
+	if path.startswith('file://'):
+		path = path[len('file://'):]
+		# file:///C:/... on windows
+		if len(path) > 2 and path[0] == '/' and path[2] == ':':
+			path = path[1:]
+	if not os.path.isabs(path):
+		path = os.path.join(directory, path)
+	return os.path.normpath(path)
+
+
+def _read_effect(dae, elem, decoded):
+	# newparam sid -> surface image id / sampler surface sid
+	surfaces = {}
+	samplers = {}
+	for newparam in elem.iter(f'{COLLADA_NS}newparam'):
+		surface = newparam.find(_ns('surface/init_from'))
+		if surface is not None:
+			surfaces[newparam.get('sid')] = surface.text
+		source = newparam.find(_ns('sampler2D/source'))
+		if source is not None:
+			samplers[newparam.get('sid')] = source.text
+	effect = {}
+	technique = elem.find(_ns('profile_COMMON/technique'))
+	if technique is None:
+		dae.effects[elem.get('id')] = effect
+		return
+	shader = next(iter(technique), None)
+	for channel in ('diffuse', 'specular', 'ambient'):
+		param = shader.find(_ns(channel)) if shader is not None else None
+		if param is None:
+			continue
+		texture = param.find(_ns('texture'))
+		if texture is not None:
+			sampler = texture.get('texture')
+			# texture points at a sampler, which points at a surface, which points at the image
+			# some exporters skip all that and point straight at the image
+			image = surfaces.get(samplers.get(sampler), sampler)
+			effect[channel] = image
+			continue
+		color = param.find(_ns('color'))
+		if color is not None and color.text:
+			effect[channel] = tuple(float(c) for c in color.text.split())
+	dae.effects[elem.get('id')] = effect
+
+
+def _read_material(dae, elem, decoded):
+	instance = elem.find(_ns('instance_effect'))
+	effect = _url(instance.get('url')) if instance is not None else None
+	dae.materials[elem.get('id')] = (elem.get('name') or elem.get('id'), effect)
+
+
+def _read_sources(elem, decoded):
+	sources = {}
+	for source in elem.findall(_ns('source')):
+		array = None
+		for child in source:
+			if child in decoded:
+				array = decoded[child]
+				break
+		if array is None:
+			continue
+		accessor = source.find(_ns('technique_common/accessor'))
+		stride = int(accessor.get('stride', 1)) if accessor is not None else 1
+		if isinstance(array, np.ndarray) and stride > 1:
+			array = array[:len(array) - len(array) % stride].reshape(-1, stride)
+		sources[source.get('id')] = (array, stride)
+	return sources
+
+
+def _read_geometry(dae, elem, decoded):
+	mesh = elem.find(_ns('mesh'))
+	if mesh is None:
+		return
+	geometry = DaeGeometry(elem.get('id'), elem.get('name') or elem.get('id'))
+	geometry.sources = _read_sources(mesh, decoded)
+	for vertices in mesh.findall(_ns('vertices')):
+		for input in vertices.findall(_ns('input')):
+			if input.get('semantic') == 'POSITION':
+				geometry.vertices[vertices.get('id')] = _url(input.get('source'))
+	for child in mesh:
+		tag = _tag(child)
+		if tag not in ('triangles', 'polylist'):
+			if tag == 'polygons':
+				print(f'skipping <polygons> in {geometry.name}, not supported')
+			continue
+		primitive = DaePrimitive(child.get('material'), int(child.get('count', 0)))
+		for input in child.findall(_ns('input')):
+			primitive.inputs.append((
+				input.get('semantic'),
+				_url(input.get('source')),
+				int(input.get('offset', 0)),
+				int(input.get('set', 0)),
+			))
+		p = child.find(_ns('p'))
+		primitive.p = decoded.get(p, np.zeros(0, dtype=np.int32))
+		if tag == 'polylist':
+			primitive.vcount = decoded.get(child.find(_ns('vcount')))
+		geometry.primitives.append(primitive)
+	dae.geometries[geometry.id] = geometry
+
+
+def _read_controller(dae, elem, decoded):
+	skin = elem.find(_ns('skin'))
+	if skin is None:
+		return
+	controller = DaeController(elem.get('id'), elem.get('name'), _url(skin.get('source')))
+	bind_shape = skin.find(_ns('bind_shape_matrix'))
+	if bind_shape is not None and bind_shape.text:
+		controller.bind_shape_matrix = _matrix(bind_shape.text)
+	sources = _read_sources(skin, decoded)
+	for input in skin.findall(_ns('joints/input')):
+		array, stride = sources.get(_url(input.get('source')), (None, 1))
+		if input.get('semantic') == 'JOINT':
+			controller.joints = list(array or [])
+		elif input.get('semantic') == 'INV_BIND_MATRIX':
+			controller.inv_bind_matrices = array
+	vertex_weights = skin.find(_ns('vertex_weights'))
+	if vertex_weights is not None:
+		offsets = []
+		for input in vertex_weights.findall(_ns('input')):
+			offset = int(input.get('offset', 0))
+			offsets.append(offset)
+			if input.get('semantic') == 'JOINT':
+				controller.joint_offset = offset
+			elif input.get('semantic') == 'WEIGHT':
+				controller.weight_offset = offset
+				controller.weights = sources.get(_url(input.get('source')), (None, 1))[0]
+		controller.stride = max(offsets, default=1) + 1
+		controller.vcount = decoded.get(vertex_weights.find(_ns('vcount')))
+		controller.v = decoded.get(vertex_weights.find(_ns('v')))
+	dae.controllers[controller.id] = controller
+
+
+# matrices are plain 4x4 numpy arrays here, the blender side turns them into mathutils ones
+def _matrix(text):
+	# collada matrices are row major, same as numpy and mathutils
+	return np.array([float(v) for v in text.split()][:16], dtype=np.float64).reshape(4, 4)
+
+
+def translation(x, y, z):
+	matrix = np.identity(4)
+	matrix[:3, 3] = (x, y, z)
+	return matrix
+
+
+# same as mathutils Matrix.Rotation with an axis vector, angle in radians
+def rotation(angle, axis):
+	axis = np.asarray(axis, dtype=np.float64)
+	axis = axis / (np.linalg.norm(axis) or 1.0)
+	x, y, z = axis
+	cross = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+	matrix = np.identity(4)
+	matrix[:3, :3] = math.cos(angle) * np.identity(3) + math.sin(angle) * cross + (1 - math.cos(angle)) * np.outer(axis, axis)
+	return matrix
+
+
+def _read_visual_scene(dae, elem, decoded):
+	# only the first visual scene is used, same as the old importer
+	if dae.nodes:
+		return
+	dae.nodes = [_read_node(node) for node in elem.findall(_ns('node'))]
+
+
+def _read_node(elem):
+	node = DaeNode(elem.get('id'), elem.get('name') or elem.get('id'), elem.get('sid'), elem.get('type', 'NODE'))
+	for child in elem:
+		tag = _tag(child)
+		if tag == 'matrix':
+			node.matrix = node.matrix @ _matrix(child.text)
+		elif tag == 'translate':
+			node.matrix = node.matrix @ translation(*(float(v) for v in child.text.split()[:3]))
+		elif tag == 'rotate':
+			x, y, z, angle = (float(v) for v in child.text.split())
+			node.matrix = node.matrix @ rotation(math.radians(angle), (x, y, z))
+		elif tag == 'scale':
+			x, y, z = (float(v) for v in child.text.split())
+			node.matrix = node.matrix @ np.diag((x, y, z, 1.0))
+		elif tag == 'node':
+			node.children.append(_read_node(child))
+		elif tag in ('instance_controller', 'instance_geometry'):
+			if tag == 'instance_controller':
+				node.controller = _url(child.get('url'))
+			else:
+				node.geometry = _url(child.get('url'))
+			for instance in child.iter(f'{COLLADA_NS}instance_material'):
+				node.bindings[instance.get('symbol')] = _url(instance.get('target'))
+	return node
+
+
+# collects joints as (node, world matrix, parent node) in parent-first order and meshes as (node, world matrix)
+def walk(dae):
+	joints = []
+	meshes = []
+	_walk(dae.nodes, np.identity(4), None, joints, meshes)
+	return joints, meshes
+
+
+def _walk(nodes, parent_matrix, parent_joint, joints, meshes):
+	for node in nodes:
+		matrix = parent_matrix @ node.matrix
+		joint = parent_joint
+		if node.type == 'JOINT':
+			joints.append((node, matrix, parent_joint))
+			joint = node
+		if node.controller or node.geometry:
+			meshes.append((node, matrix))
+		_walk(node.children, matrix, joint, joints, meshes)
+
+
+# joint sid (what controllers refer to) -> joint name (what the bones get called)
+def bone_names(joints):
+	return {node.sid or node.name: node.name for node, matrix, parent in joints}
+
+
+def node_geometry(dae, node):
+	controller = dae.controllers.get(node.controller) if node.controller else None
+	return controller, dae.geometries.get(controller.geometry if controller else node.geometry)
+
+
+# slots maps each primitive to its material slot so primitives sharing a material share a slot
+# returns (slots, material ids in slot order)
+def material_slots(node, geometry):
+	slots = []
+	used = []
+	for primitive in geometry.primitives:
+		material_id = node.bindings.get(primitive.material, primitive.material)
+		if material_id not in used:
+			used.append(material_id)
+		slots.append(used.index(material_id))
+	return slots, used
+
+
+# flattens a geometry's primitives into the arrays ts4_mesh.fill_mesh takes, or None if it has no positions
+# returns {'positions', 'loop_verts', 'face_sizes', 'material_indices', 'uvs', 'normals'}
+def mesh_arrays(geometry, bind_shape=None, slots=None):
+	positions = None
+	loop_verts = []
+	face_sizes = []
+	face_materials = []
+	normals = []
+	uvs = {}
+	for index, primitive in enumerate(geometry.primitives):
+		stride = max((offset for semantic, source, offset, set in primitive.inputs), default=0) + 1
+		p = primitive.p[:len(primitive.p) - len(primitive.p) % stride].reshape(-1, stride)
+		if primitive.vcount is not None:
+			sizes = primitive.vcount
+		else:
+			sizes = np.full(len(p) // 3, 3, dtype=np.int32)
+			p = p[:len(sizes) * 3]
+		for semantic, source, offset, set in primitive.inputs:
+			if semantic == 'VERTEX':
+				positions = geometry.sources[geometry.vertices[source]][0]
+				loop_verts.append(p[:, offset])
+			elif semantic == 'NORMAL' and source in geometry.sources:
+				normals.append(geometry.sources[source][0][p[:, offset]])
+			elif semantic == 'TEXCOORD' and source in geometry.sources:
+				uvs.setdefault(set, []).append(geometry.sources[source][0][p[:, offset], :2])
+		face_sizes.append(sizes)
+		face_materials.append(np.full(len(sizes), slots[index] if slots else index, dtype=np.int32))
+	if positions is None:
+		return None
+	positions = np.ascontiguousarray(positions[:, :3], dtype=np.float32)
+	if bind_shape is not None and not np.allclose(bind_shape, np.identity(4)):
+		matrix = np.asarray(bind_shape, dtype=np.float32)
+		positions = positions @ matrix[:3, :3].T + matrix[:3, 3]
+	return {
+		'positions': positions,
+		'loop_verts': np.concatenate(loop_verts),
+		'face_sizes': np.concatenate(face_sizes),
+		'material_indices': np.concatenate(face_materials),
+		'uvs': {'UVMap' if set == 0 else f'UVMap.{set:03}': np.concatenate(uvs[set]) for set in sorted(uvs)},
+		'normals': np.concatenate(normals)[:, :3] if normals else None,
+	}
+
+
+# turns vcount/v/weights into flat (vertex, joint, weight) arrays
+# keeps the strongest MAX_INFLUENCES per vertex, renormalizes them to 1 and rounds to WEIGHT_STEP
+def skin_weights(controller, max_influences=MAX_INFLUENCES):
+	influences = controller.v[:len(controller.v) - len(controller.v) % controller.stride].reshape(-1, controller.stride)
+	vertices = np.repeat(np.arange(len(controller.vcount), dtype=np.int32), controller.vcount)[:len(influences)]
+	joints = influences[:, controller.joint_offset]
+	weights = controller.weights[influences[:, controller.weight_offset]].astype(np.float32)
+	# joint -1 is the bind shape in collada, not a bone
+	valid = (joints >= 0) & (joints < len(controller.joints)) & (weights > 0)
+	vertices, joints, weights = vertices[valid], joints[valid], weights[valid]
+	# strongest first within each vertex, then count down the influences of each vertex
+	order = np.lexsort((-weights, vertices))
+	vertices, joints, weights = vertices[order], joints[order], weights[order]
+	rank = np.arange(len(vertices)) - np.searchsorted(vertices, vertices)
+	keep = rank < max_influences
+	vertices, joints, weights, strongest = vertices[keep], joints[keep], weights[keep], rank[keep] == 0
+	totals = np.bincount(vertices, weights, minlength=len(controller.vcount))
+	# normalized and counted in steps, rounding leaves some vertices a step or two off 1 (or drops a tiny weight),
+	# so the strongest influence takes up the difference and every vertex adds up to exactly 1 on the grid
+	steps = np.round(weights / totals[vertices] / WEIGHT_STEP).astype(np.int64)
+	residual = round(1 / WEIGHT_STEP) - np.bincount(vertices, steps, minlength=len(controller.vcount)).astype(np.int64)
+	steps[strongest] += residual[vertices[strongest]]
+	keep = steps > 0
+	return vertices[keep], joints[keep], (steps[keep] * WEIGHT_STEP).astype(np.float32)
+
+
+# finds vertices within threshold of each other using a spatial hash with cells the size of the threshold
+# returns labels where labels[i] is the lowest vertex index i gets merged into
+def find_doubles(positions, threshold):
+	count = len(positions)
+	labels = np.arange(count)
+	if count < 2:
+		return labels
+	cells = np.floor(positions / threshold).astype(np.int64)
+	# pad by 1 so neighbouring cells never wrap around when encoded
+	cells -= cells.min(axis=0) - 1
+	dims = cells.max(axis=0) + 2
+	codes = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+	order = np.argsort(codes, kind='stable')
+	unique, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+	first = []
+	second = []
+	for dx in (-1, 0, 1):
+		for dy in (-1, 0, 1):
+			for dz in (-1, 0, 1):
+				target = codes + (dx * dims[1] + dy) * dims[2] + dz
+				slot = np.minimum(np.searchsorted(unique, target), len(unique) - 1)
+				found = unique[slot] == target
+				vertices = np.flatnonzero(found)
+				slot = slot[found]
+				sizes = counts[slot]
+				a = np.repeat(vertices, sizes)
+				# index of each pair within its neighbour cell
+				ramp = np.arange(len(a)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+				b = order[np.repeat(starts[slot], sizes) + ramp]
+				keep = a < b
+				a = a[keep]
+				b = b[keep]
+				close = ((positions[a] - positions[b]) ** 2).sum(axis=1) <= threshold * threshold
+				first.append(a[close])
+				second.append(b[close])
+	a = np.concatenate(first)
+	b = np.concatenate(second)
+	if not len(a):
+		return labels
+	# connected components by pushing the lowest label along every pair until nothing changes
+	while True:
+		low = np.minimum(labels[a], labels[b])
+		previous = labels.copy()
+		np.minimum.at(labels, a, low)
+		np.minimum.at(labels, b, low)
+		labels = labels[labels]
+		if np.array_equal(labels, previous):
+			return labels
+
+
+# file names and the TSR naming rules
+
+IMAGE_EXTENSIONS = ('.png', '.dds', '.jpg', '.jpeg', '.tga')
+INIT_FROM = re.compile(rb'<init_from>\s*(?:<ref>\s*)?([^<]+?)\s*</')
+
+
+# file name without folder or extension, what the model gets called - same as bpy.path.display_name_from_filepath
+def model_name(filepath):
+	return os.path.splitext(os.path.basename(filepath))[0]
+
+
+# TSR exports textures with ' ' turned to '_'
+def clean_name(name):
+	return name.replace(' ', '_')
+
+
+# the naming convention is ModelName_normalmap.png next to ModelName.dae
+def normal_map_path(filepath):
+	return os.path.join(os.path.dirname(os.path.abspath(filepath)), f'{clean_name(model_name(filepath))}_normalmap.png')
+
+
+# every image path the dae mentions plus the normal map that sits next to it by naming convention
+# data is the dae's bytes, so this works without parsing it - the paths come out the same as read_dae's images
+def image_paths(filepath, data):
+	folder = os.path.dirname(os.path.abspath(filepath))
+	paths = {normal_map_path(filepath)}
+	for match in INIT_FROM.finditer(data):
+		path = html.unescape(match.group(1).decode('utf-8', 'replace'))
+		if path.lower().endswith(IMAGE_EXTENSIONS):
+			paths.add(resolve_image_path(folder, path))
+	return sorted(paths)
+
+
+# image_paths for a file on disk, scanned through a memory map instead of reading it all in
+def read_image_paths(filepath):
+	with open(filepath, 'rb') as file:
+		try:
+			mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			return image_paths(filepath, b'')
+		with mapped:
+			return image_paths(filepath, mapped)
+
+
+# files picked in the browser, or every .dae in the directory if none were picked
+def get_filepaths(directory, filenames, filepath=''):
+	filenames = [filename for filename in filenames if filename]
+	if not directory:
+		return [filepath] if filepath else []
+	if not filenames:
+		filenames = sorted(filename for filename in os.listdir(directory) if filename.lower().endswith('.dae'))
+	return [os.path.join(directory, filename) for filename in filenames]
+
+
+# how many models DaePool and Prefetcher work ahead, and how many bytes of dae they hold on to at most
+PREFETCH_AHEAD = 4
+PREFETCH_BUDGET = 512 * 2**20
+
+
+# parses dae files in worker processes while the caller gets on with building the ones already done
+# with DaePool(filepaths) as pool: dae = pool.read(filepath)
+# only the next few files after the one being read are looked at (ahead, and budget bytes of dae between them)
+# so the finished scenes waiting to be picked up stay bounded however big the batch is
+# skip(filepath) returning True (like for a cache hit) leaves a file out, it's never parsed unless it's read -
+# skipped files still take up their place in the window, so skip only gets called as the window moves along
+# files are expected to be read in the order they were given - reading one drops anything before it that was
+# never read, done(filepath) does the same for a file that won't be read at all
+# anything that isn't parsed in a worker is parsed with read in this process, also what happens if the workers
+# can't start (blender can refuse to spawn them)
+class DaePool:
+	def __init__(self, filepaths, jobs=None, ahead=PREFETCH_AHEAD, budget=PREFETCH_BUDGET, skip=None, read=read_dae):
+		self.filepaths = list(filepaths)
+		self.order = {filepath: index for index, filepath in enumerate(self.filepaths)}
+		self.ahead = ahead
+		self.budget = budget
+		self.skip = skip
+		self.fallback = read
+		self.held = 0
+		# filepath -> (future, file size)
+		self.futures = {}
+		# the window is position up to position + ahead
+		self.position = 0
+		self.next = 0
+		self.executor = None
+		if not self.filepaths:
+			return
+		try:
+			self.executor = ProcessPoolExecutor(jobs or min(len(self.filepaths), self.ahead, os.cpu_count() or 1) or 1)
+		except (OSError, RuntimeError, NotImplementedError) as error:
+			print(f'parsing in this process, could not start workers: {error}')
+			return
+		self._fill()
+
+	def _fill(self):
+		end = min(len(self.filepaths), self.position + self.ahead)
+		while self.executor is not None and self.next < end:
+			filepath = self.filepaths[self.next]
+			try:
+				size = os.path.getsize(filepath)
+			except OSError:
+				size = 0
+			# always at least one in flight, even a file bigger than the whole budget
+			if self.futures and self.held + size > self.budget:
+				return
+			self.next += 1
+			if self.skip is not None and self.skip(filepath):
+				continue
+			try:
+				self.futures[filepath] = (self.executor.submit(read_dae, filepath), size)
+			except (BrokenProcessPool, RuntimeError):
+				self.executor = None
+				return
+			self.held += size
+
+	def _pop(self, filepath):
+		future, size = self.futures.pop(filepath)
+		self.held -= size
+		return future
+
+	# moves the window past filepath, dropping it and anything before it that's still waiting to be read
+	def done(self, filepath):
+		index = self.order.get(filepath)
+		if index is None:
+			return
+		for skipped in [skipped for skipped in self.futures if self.order[skipped] <= index]:
+			self._pop(skipped).cancel()
+		self.position = max(self.position, index + 1)
+		self._fill()
+
+	def read(self, filepath):
+		future = self._pop(filepath) if filepath in self.futures else None
+		self.done(filepath)
+		if future is not None:
+			try:
+				return future.result()
+			except BrokenProcessPool:
+				self.executor = None
+		return self.fallback(filepath)
+
+	# files that were never read (cache hits) get cancelled if they haven't started
+	def close(self):
+		if self.executor is not None:
+			self.executor.shutdown(wait=False, cancel_futures=True)
+			self.executor = None
+		self.futures.clear()
+		self.held = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+		return False
+
+
+def _read_through(path):
+	try:
+		with open(path, 'rb') as file:
+			while file.read(2**20):
+				pass
+	except OSError:
+		pass
+
+
+# reads the next few models' files on background threads while the current model is being built, hiding the
+# disk (or NAS) latency behind the blender work - read(filepath) then parses from memory
+# dae bytes are held until read up to budget, past that a file is only read through to warm the os cache
+# textures are always just read through, blender has to load images itself on the main thread
+# files are expected to be read in the order they were given - reading one drops anything before it that was
+# never read (like cache hits), and a file that isn't in the list just reads from disk
+# a file that's never read should be passed to done() so the reading carries on past it
+class Prefetcher:
+	def __init__(self, filepaths, ahead=PREFETCH_AHEAD, budget=PREFETCH_BUDGET, threads=4):
+		self.filepaths = list(filepaths)
+		self.order = {filepath: index for index, filepath in enumerate(self.filepaths)}
+		self.ahead = ahead
+		self.budget = budget
+		self.held = 0
+		self.lock = threading.Lock()
+		self.executor = ThreadPoolExecutor(threads, thread_name_prefix='ts4_prefetch')
+		self.futures = {}
+		self.next = 0
+		self._fill()
+
+	def _fill(self):
+		while self.next < len(self.filepaths) and len(self.futures) < self.ahead:
+			filepath = self.filepaths[self.next]
+			self.next += 1
+			self.futures[filepath] = self.executor.submit(self._fetch, filepath)
+
+	def _reserve(self, size):
+		with self.lock:
+			if self.held + size > self.budget:
+				return False
+			self.held += size
+			return True
+
+	def _release(self, size):
+		with self.lock:
+			self.held -= size
+
+	def _fetch(self, filepath):
+		size = os.path.getsize(filepath)
+		if not self._reserve(size):
+			_read_through(filepath)
+			_read_through(normal_map_path(filepath))
+			return None
+		try:
+			with open(filepath, 'rb') as file:
+				data = file.read()
+		except OSError:
+			self._release(size)
+			raise
+		for path in image_paths(filepath, data):
+			_read_through(path)
+		return data, size
+
+	def _drop(self, filepath):
+		future = self.futures.pop(filepath)
+		if not future.cancel() and future.exception() is None and future.result() is not None:
+			self._release(future.result()[1])
+
+	# the bytes of filepath if they're being held for it, without using them up - None if it's read from disk
+	def peek(self, filepath):
+		future = self.futures.get(filepath)
+		try:
+			fetched = future.result() if future is not None else None
+		except OSError:
+			fetched = None
+		return fetched[0] if fetched is not None else None
+
+	# for a file that won't be read (a cache hit) - drops it and anything before it, and reads further ahead
+	def done(self, filepath):
+		index = self.order.get(filepath)
+		if index is None:
+			return
+		for skipped in [skipped for skipped in self.futures if self.order[skipped] <= index]:
+			self._drop(skipped)
+		self._fill()
+
+	def read(self, filepath):
+		index = self.order.get(filepath, -1)
+		for skipped in [skipped for skipped in self.futures if self.order[skipped] < index]:
+			self._drop(skipped)
+		future = self.futures.pop(filepath, None)
+		self._fill()
+		try:
+			fetched = future.result() if future is not None else None
+		except OSError:
+			fetched = None
+		if fetched is None:
+			return read_dae(filepath)
+		data, size = fetched
+		try:
+			return read_dae(filepath, data)
+		finally:
+			self._release(size)
+
+	def close(self):
+		for filepath in list(self.futures):
+			self._drop(filepath)
+		self.executor.shutdown(wait=False, cancel_futures=True)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+		return False
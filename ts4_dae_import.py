@@ -1,88 +1,122 @@
+import os
+import sys
+import traceback
 import bpy
 import bpy.ops
-from bpy.types import Operator
-from bpy.props import StringProperty, BoolProperty, EnumProperty
+from bpy.types import Operator, OperatorFileListElement
+from bpy.props import StringProperty, BoolProperty, EnumProperty, CollectionProperty
 from bpy_extras.io_utils import ImportHelper
 from mathutils import Vector
 
+# blender doesn't put the script's folder on sys.path, needed to find ts4_collada
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+	sys.path.append(script_dir)
+import ts4_cache
+import ts4_cleanup
+import ts4_collada
+import ts4_core
+import ts4_layout
+import ts4_mesh
+import ts4_names
+import ts4_stats
+import ts4_textures
+import ts4_watch
+
 # !!!! https://docs.blender.org/api/current/bpy.types.FileHandler.html read here
 
 
-# I need to check for duplicates when renaming things - it seems to be causing some issues
 # to do:
-	# remove the light that gets imported
 	# add subsurf modifier
 	# attach emission map
-def import_dae(filepath):
+# merge=False skips merge_vertices, collection defaults to the active collection
+# read is what turns filepath into a DaeScene, a DaePool's read when the parsing happens in other processes
+# names is the batch's NameRegistry, a fresh one is made for a single import
+# before is a ts4_cleanup snapshot the caller already took, so the file's datablocks are only gone through once
+# returns the rig so callers don't have to rely on it being the active object
+def import_dae(filepath, merge=True, collection=None, read=ts4_core.read_dae, names=None, before=None):
 	name = bpy.path.display_name_from_filepath(filepath)
-	view_layer = bpy.context.view_layer
+	names = names or ts4_names.NameRegistry()
 	print(f'Importing {name}...')
-	# import collada, brings up file select
-	bpy.ops.wm.collada_import(filepath=filepath, display_type='DEFAULT', filter_collada=True)
-	# rig is active object now after import
-	rig = view_layer.objects.active
-	rig.name = f'{name}_rig'
-	# upon import the main model is automatically at rig.children[0] and glass is at rig.children[1]
-	# this order will change when you rename the main model
-	model = rig.children[0]
-	# check for glass, do this before renaming main model so it's still alphabetical
-	if len(rig.children) > 1:
-		glass = rig.children[1]
-		print(f'glass identified: {glass.name}') # for testing
-		# remove merge=False later when I clean up
-		config_object(glass, f'{name}_glass')
-		config_shaders(glass, has_normal=False, has_alpha=True)
-		glass.select_set(False)
-	config_object(model, name)
-	config_shaders(model, filepath=filepath, name=name)
-	merge_vertices(model)
+	ts4_stats.begin_model(name, filepath)
+	before = before or ts4_cleanup.snapshot()
+	# our own reader instead of collada_import - much faster on big TSR exports and doesn't bring in the light
+	with ts4_stats.stage('parse'):
+		dae = read(filepath)
+	with ts4_stats.stage('object_config'):
+		rig, meshes = ts4_collada.build_scene(dae, collection or bpy.context.collection)
+		# ts4_watch uses these to find the file again and redo the merge after a re-export
+		rig['ts4_source'] = os.path.abspath(filepath)
+		# meshes come back sorted by name so the main model is meshes[0] and glass is meshes[1]
+		# this order will change when you rename the main model
+		model = meshes[0]
+		# lets a cached copy find its main model whatever order its objects come back in
+		model['ts4_main'] = True
+		glass = None
+		# check for glass, do this before renaming main model so it's still alphabetical
+		if len(meshes) > 1:
+			glass = meshes[1]
+			print(f'glass identified: {glass.name}') # for testing
+			# lets a cached copy tell its glass from its main model
+			glass['ts4_glass'] = True
+		name_model(names, name, rig, model, glass)
+		# anything past the glass keeps its own name, but nothing else should be handed it
+		names.track(*meshes[2:], *(mesh.active_material for mesh in meshes[2:]))
+	ts4_stats.count(
+		meshes=len(meshes),
+		bones=len(rig.data.bones),
+		vertices=sum(len(mesh.data.vertices) for mesh in meshes),
+		faces=sum(len(mesh.data.polygons) for mesh in meshes),
+	)
+	with ts4_stats.stage('shader_config'):
+		if glass is not None:
+			config_shaders(glass, has_normal=False, has_alpha=True)
+		config_shaders(model, filepath=filepath, name=name)
+	if merge:
+		with ts4_stats.stage('merge'):
+			removed = merge_vertices(model)
+		model['ts4_merge'] = True
+		ts4_stats.count(merged_vertices=removed)
+	# glass layers and accessories repeat between outfits of the same sim, those end up sharing one mesh
+	with ts4_stats.stage('share_meshes'):
+		shared = ts4_mesh.share_meshes(meshes)
+	ts4_stats.count(shared_meshes=shared)
 	# does approximately the same thing as SimRipper's 
 	# this is where I should add the subsurf modifier
 	# I think I want to start it at 0,0 but I might set it to 0,1
 	# when I get the UI in place I'll let the user decide if/how to use subsurf mods
 
-	view_layer.objects.active = rig
-	# not sure if I need to go back to this being active but I'll leave it for now
+	# selection and the active object are left alone, import_model sets them once the whole batch is in
+	# anything this import made that ended up unused (replaced materials, swapped out meshes, lights) goes now
+	# so long batch sessions don't keep growing
+	with ts4_stats.stage('cleanup'):
+		sweep = ts4_cleanup.sweep(before)
+	print(f'cleanup: {sweep}')
+	ts4_stats.count(freed_bytes=sweep.freed_bytes)
+	ts4_stats.end_model()
+	return rig
 
+# lays the tree out from its links, so it works whatever nodes end up in it
 def arrange_nodes(tree):
-	nodes = tree.nodes
-	print([f'{node.name} | location: ({node.location.x}, {node.location.y}); width: {node.width}; height: {node.height}' for node in nodes])
-	# reference nodes
-	bsdf = nodes.get('Principled BSDF')
-	mat_output = nodes.get('Material Output')
-	color = nodes.get('Image Texture')
-	spec = nodes.get('Image Texture.001')
-	ambient = nodes.get('RGB')
-	spacing = bsdf.location.x - color.location.x + color.width
-	# move ambient below material output
-	ambient.location.x = mat_output.location.x
-	ambient.location.y = mat_output.location.y - 175
-	# Image Texture.002 is how normal maps import - glass does not have normal
-	if 'Image Texture.002' in nodes:
-		normal = nodes.get('Image Texture.002')
-		mapping = nodes.get('Mapping')
-		normal_map = nodes.get('Normal Map')
-		# move normal map underneath base color
-		normal_map.location.x = color.location.x + color.width/2 - normal_map.width/2
-		normal_map.location.y = color.location.y - 325
-		# move mapping to the left of base color level with normal map
-		mapping.location.x = color.location.x - (mapping.width+25)
-		mapping.location.y = normal_map.location.y
-		# move normal to the left of mapping at the same y
-		normal.location.x = mapping.location.x - (normal.width+25)
-		normal.location.y = mapping.location.y
-		spec.location.y = normal_map.location.y - 200
-	# when there's no normal map like with glass move specular closer to base color
-	else:
-		spec.location.x = color.location.x
-		spec.location.y = color.location.y - 300
-	print([f'{node.name}: ({node.location.x},{node.location.y})' for node in nodes])
+	ts4_layout.arrange_tree(tree)
+
+
+# rig, main model, glass and their materials all get their names from one base name so they always match up
+# the base is name, or name.001 and so on if any of those names are already taken, returns the base
+def name_model(names, name, rig, model, glass=None):
+	base = names.model_name(name)
+	names.rename(rig, f'{base}_rig')
+	if glass is not None:
+		config_object(glass, f'{base}_glass', names)
+	config_object(model, base, names)
+	return base
 
 
 # renames object and material
-def config_object(model, name):
-	model.name = name
-	model.active_material.name = f'{name}_material'
+def config_object(model, name, names=None):
+	names = names or ts4_names.NameRegistry()
+	names.rename(model, name)
+	names.rename(model.active_material, f'{name}_material')
 	# I'm going to try commenting this out and running merge_vertices in import_dae
 		# had no effect on Adelyn Fay but it seems best practice to run this after the shader config
 	# if merge:
@@ -92,34 +126,55 @@ def config_object(model, name):
 '''
 I cannot figure out how to make this work so for right now i'm going to just not include
 '''
-def merge_vertices(model):
-	bpy.context.view_layer.objects.active = model
-	bpy.ops.object.editmode_toggle()
-	bpy.ops.mesh.select_all(action='SELECT')
-	bpy.ops.mesh.remove_doubles(threshold=0.0001, use_unselected=False, use_sharp_edge_from_normals=True)
-	bpy.ops.object.editmode_toggle()
-	print('merge_vertices()')
+# same job as remove_doubles but done on numpy arrays in object mode, no edit mode round trip
+# keeps uvs, vertex groups and custom normals
+def merge_vertices(model, threshold=0.0001):
+	removed = ts4_mesh.weld_vertices(model, threshold)
+	print(f'merge_vertices(): removed {removed} vertices')
+	return removed
 
 
 # has_specular=True for both base model and glass
 # has_normal=True for only base model
 # has_alpha=True only for glass
-# to do:
-	# rearrange nodes to make the tree tidier
+# the graph for each combination is built once as a template, every model just gets a copy with its own images
 def config_shaders(model, has_specular=True, has_normal=True, has_alpha=False, filepath='', name=''):
-	tree = model.active_material.node_tree
-	# tree.nodes.get('RGB').location = mathutils.Vector((1400, 736))
-	# tree.nodes.get('Principled BSDF').location = mathutils.Vector((1146, 910))
-	# tree.nodes.get('Material Output').location = mathutils.Vector((1352, 907))
-	if has_specular:
-		config_specular(tree)
+	material = model.active_material
+	material_name = material.name
+	old_nodes = material.node_tree.nodes
+	shader = get_template(has_specular, has_normal, has_alpha).copy()
+	nodes = shader.node_tree.nodes
+	nodes.get('Image Texture').image = old_nodes.get('Image Texture').image
+	nodes.get('Image Texture.001').image = old_nodes.get('Image Texture.001').image
+	nodes.get('RGB').outputs['Color'].default_value = old_nodes.get('RGB').outputs['Color'].default_value
 	# only base though I do need to see if glass is supposed to use the same normal map as the base
 	# I don't think so but it's worth checking
 	if has_normal:
-		config_normal(tree, filepath, name)
+		nodes.get('Image Texture.002').image = load_normal(filepath, name)
+	model.active_material = shader
+	# the material from the dae was only needed for its images
+	if material.users == 0:
+		bpy.data.materials.remove(material)
+	shader.name = material_name
+
+
+# template materials are hidden with a leading '.' and rebuilt whenever they're missing from the file
+def get_template(has_specular=True, has_normal=True, has_alpha=False):
+	flags = [flag for flag, enabled in (('specular', has_specular), ('normal', has_normal), ('alpha', has_alpha)) if enabled]
+	template_name = '_'.join(['.ts4_template'] + flags)
+	template = bpy.data.materials.get(template_name)
+	if template is not None:
+		return template
+	template = ts4_collada.new_material(template_name)
+	tree = template.node_tree
+	if has_specular:
+		config_specular(tree)
+	if has_normal:
+		config_normal(tree)
 	if has_alpha:
 		config_alpha(tree)
 	arrange_nodes(tree)
+	return template
 
 
 # specular texture node exists but is not attached to the rest of the tree
@@ -132,7 +187,7 @@ def config_specular(tree):
 
 
 # normal does not automatically end up on tree, must create normal map, vector mapping, and image texture nodes
-def config_normal(tree, filepath, name):
+def config_normal(tree, filepath='', name=''):
 	nodes = tree.nodes
 	bsdf = nodes.get('Principled BSDF')
 	# create normal map node and attach to BSDF's Normal input
@@ -149,24 +204,16 @@ def config_normal(tree, filepath, name):
 	normal_texture = nodes.new ('ShaderNodeTexImage')
 	# normal_texture.location = mathutils.Vector((300, 500))
 	tree.links.new(mapping.inputs["Vector"], normal_texture.outputs['Color'])
-	# open image from file
+	if filepath:
+		normal_texture.image = load_normal(filepath, name)
+
+
+def load_normal(filepath, name):
 	# need to clean name because TSR exports textures with ' ' turned to '_'
-	clean_name = name.replace(' ', '_')
-	# len('.png') and len('.dae') = 4; this gives the length of ModelName.dae so I can grab just the filename
-	# so I can get ModelName_normalmap.png from the filepath - that's the naming convention
-	length = 4 + len(name) 
-	# there is definitely a cleaner way to handle this, but meh it works it's just a bit sloppy
-	normal_path = f'{filepath[:-length]}{clean_name}_normalmap.png'
-	print(f'normal path: {normal_path}') # for testing
-	filename = f'{clean_name}_normalmap.png'
-	print(f'filename: {filename}') # for testing
-	dir_path = filepath[:-len(f'{name}.dae')]
-	print(f'dir_path = {dir_path}') # for testing
-	relpath = bpy.path.relpath(normal_path)
-	print(f'relpath: {relpath}') # for testing
-	bpy.ops.image.open(filepath=relpath, directory=dir_path, files=[{"name":filename, "name":filename}], show_multiview=False)
-	# set image
-	normal_texture.image = bpy.data.images.get(filename)
+	# the naming convention is ModelName_normalmap.png next to ModelName.dae
+	normal_path = os.path.join(os.path.dirname(filepath), f'{ts4_core.clean_name(name)}_normalmap.png')
+	# goes through the shared cache so sims with the same textures don't load duplicates
+	return ts4_textures.load_image(normal_path)
 
 
 # for use only when glass layer is present
@@ -177,15 +224,183 @@ def config_alpha(tree):
 	tree.links.new(bsdf.inputs['Alpha'], base_color_node.outputs['Alpha'])
 
 
-def import_model(context, filepath):
-	import_dae(filepath)
+# checks the import cache first and only runs the full import on a miss, returns the rig
+# link=True links the cached objects instead of appending them, data is the dae's bytes if they're already read
+# key is filepath's cache_key if the caller has worked it out already
+def import_cached(filepath, merge=True, collection=None, link=False, read=ts4_core.read_dae, names=None, data=None, before=None, key=None):
+	collection = collection or bpy.context.collection
+	names = names or ts4_names.NameRegistry()
+	key = key or ts4_cache.cache_key(filepath, {'merge': merge}, data)
+	path = ts4_cache.lookup(key)
+	if path is None:
+		rig = import_dae(filepath, merge, collection, read, names, before)
+		try:
+			ts4_cache.store(key, [rig, *rig.children])
+		except (OSError, RuntimeError) as error:
+			print(f'could not write import cache: {error}')
+		return rig
+	name = bpy.path.display_name_from_filepath(filepath)
+	print(f'Loading {name} from cache...')
+	ts4_stats.begin_model(name, filepath)
+	with ts4_stats.stage('cache_load'):
+		objects = ts4_cache.load(path, collection, link)
+	rig = adopt_model(names, name, objects, link)
+	ts4_stats.end_model()
+	return rig
+
+
+# for a model that came in from another .blend (a cache hit or a batch worker's output) instead of being built here
+# its textures, armature and meshes are swapped for the ones already in the file where they're the same,
+# and whatever blender suffixed it with on the way in, it gets a matching set of names like a fresh import
+# linked models can't be changed, only their meshes get shared - returns the rig
+def adopt_model(names, name, objects, link=False):
+	rig = next((obj for obj in objects if obj.type == 'ARMATURE'), None)
+	meshes = [obj for obj in objects if obj.type == 'MESH']
+	model = next((obj for obj in meshes if obj.get('ts4_main')), None)
+	if not link:
+		for image in model_images(meshes):
+			ts4_textures.adopt_image(image)
+		if rig is not None:
+			ts4_collada.share_armature(rig)
+		if rig is not None and model is not None:
+			glass = next((obj for obj in meshes if obj.get('ts4_glass')), None)
+			name_model(names, name, rig, model, glass)
+			# accessories keep their own names, same as in import_dae
+			others = [obj for obj in meshes if obj != model and obj != glass]
+			names.track(*others, *(obj.active_material for obj in others))
+	with ts4_stats.stage('share_meshes'):
+		shared = ts4_mesh.share_meshes(objects)
+	ts4_stats.count(shared_meshes=shared)
+	return rig
+
+
+# every image the objects' materials use
+def model_images(objects):
+	images = set()
+	for obj in objects:
+		for slot in obj.material_slots:
+			if slot.material is not None and slot.material.node_tree is not None:
+				images.update(node.image for node in slot.material.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image is not None)
+	return images
+
+
+# imports every model in one go - the operator only pays for one undo step and one depsgraph update
+def import_model(context, filepaths, use_cache=True):
+	batch = ImportBatch(filepaths, use_cache)
+	while not batch.done:
+		batch.step()
+	batch.finish(context)
+	print(batch.summary())
 	return {'FINISHED'}
 
 
+# a batch of imports that goes one model per step(), so the modal operator can hand control back between models
+# a file that fails gets its half-built datablocks removed and its error kept for the summary, the rest carry on
+# with more than one file the parsing runs in worker processes, this one only builds the datablocks
+# the next few files (and their textures) are read on background threads, so the cache keys are worked out from
+# bytes already in memory - cache hits are left out of the parsing, they're loaded from the cache instead
+class ImportBatch:
+	def __init__(self, filepaths, use_cache=True):
+		self.filepaths = filepaths
+		self.use_cache = use_cache
+		self.index = 0
+		# names rather than the objects, which aren't safe to hold on to between steps
+		self.rigs = []
+		# filepath -> traceback
+		self.errors = {}
+		# read once for the whole batch, so the 500th sim's names cost the same as the first's
+		self.names = ts4_names.NameRegistry()
+		# filepath -> cache key, worked out as the pool's window gets to each file
+		self.keys = {}
+		self.prefetcher = ts4_core.Prefetcher(filepaths)
+		# started by the first step, so working out the first few keys doesn't hold up the operator starting
+		self.pool = None
+
+	def cached(self, filepath):
+		try:
+			key = self.keys[filepath] = ts4_cache.cache_key(filepath, {'merge': True}, self.prefetcher.peek(filepath))
+		except OSError:
+			return False
+		return os.path.exists(ts4_cache.entry_path(key))
+
+	@property
+	def done(self):
+		return self.index >= len(self.filepaths)
+
+	def step(self):
+		if self.pool is None:
+			skip = self.cached if self.use_cache else None
+			self.pool = ts4_core.DaePool(self.filepaths if len(self.filepaths) > 1 else [], skip=skip, read=self.prefetcher.read)
+		filepath = self.filepaths[self.index]
+		self.index += 1
+		before = ts4_cleanup.snapshot()
+		try:
+			if self.use_cache:
+				key = self.keys.pop(filepath, None)
+				data = self.prefetcher.peek(filepath) if key is None else None
+				rig = import_cached(filepath, read=self.pool.read, names=self.names, data=data, before=before, key=key)
+			else:
+				rig = import_dae(filepath, read=self.pool.read, names=self.names, before=before)
+		except Exception:
+			self.errors[filepath] = traceback.format_exc()
+			print(f'could not import {filepath}:\n{self.errors[filepath]}')
+			ts4_cleanup.discard(before)
+			return None
+		finally:
+			# a cache hit never reads, this moves both windows along all the same - the prefetcher's first,
+			# so the keys the pool works out next come from its bytes
+			self.prefetcher.done(filepath)
+			self.pool.done(filepath)
+		if rig is not None:
+			self.rigs.append(rig.name)
+		return rig
+
+	def close(self):
+		self.prefetcher.close()
+		if self.pool is not None:
+			self.pool.close()
+
+	def finish(self, context):
+		self.close()
+		ts4_textures.evict_unused()
+		select_imported(context.view_layer, self.rigs)
+		context.view_layer.update()
+
+	def summary(self):
+		stopped = f', stopped after {self.index} of {len(self.filepaths)}' if not self.done else ''
+		text = f'imported {self.index - len(self.errors)} models{stopped}'
+		if self.errors:
+			names = ', '.join(os.path.basename(filepath) for filepath in self.errors)
+			text += f', {len(self.errors)} failed: {names} (see the console)'
+		return text
+
+
+# leaves things the way collada_import did - the imported rigs and meshes selected, the last rig active
+# the glass layer stays unselected so the main model is what gets grabbed
+# rigs are names, any that have been deleted (or aren't in view_layer) since they were imported are left out
+def select_imported(view_layer, rigs):
+	rigs = [rig for rig in map(view_layer.objects.get, rigs) if rig is not None]
+	if not rigs:
+		return
+	for obj in view_layer.objects:
+		obj.select_set(False)
+	for rig in rigs:
+		rig.select_set(True)
+		for child in rig.children:
+			if view_layer.objects.get(child.name) is not None:
+				child.select_set(not child.name.endswith('_glass'))
+	view_layer.objects.active = rigs[-1]
+
+
+# ctrl/cmd + these is undo or redo
+UNDO_KEYS = {'Z', 'Y'}
+
+
 # sets up the script to run in this environment
 class ImportModel(Operator, ImportHelper):
 	bl_idname = 'import_test.import_model'
 	bl_label = 'Import DAE'
+	bl_options = {'REGISTER', 'UNDO'}
 
 	filename_ext = '.dae'
 
@@ -195,13 +410,80 @@ class ImportModel(Operator, ImportHelper):
 		maxLen=255
 		)
 
+	directory: StringProperty(subtype='DIR_PATH', options={'SKIP_SAVE', 'HIDDEN'})
+	files: CollectionProperty(type=OperatorFileListElement, options={'SKIP_SAVE', 'HIDDEN'})
+
+	use_cache: BoolProperty(
+		name='Use Import Cache',
+		description='Reuse finished imports of unchanged files instead of importing them again',
+		default=True,
+		)
+
 	def execute(self, context):
-		return import_model(context, self.filepath)
+		filepaths = ts4_core.get_filepaths(self.directory, [file.name for file in self.files], self.filepath)
+		# nothing to keep responsive without a window (background mode), and one file isn't worth it
+		# redo (the adjust last operation panel) has to finish in one go too, it can't be left running
+		if context.window is None or len(filepaths) < 2 or self.options.is_repeat:
+			return import_model(context, filepaths, self.use_cache)
+		# one model per timer tick, blender redraws and handles input in between
+		self.batch = ImportBatch(filepaths, self.use_cache)
+		window_manager = context.window_manager
+		self.timer = window_manager.event_timer_add(0.01, window=context.window)
+		window_manager.modal_handler_add(self)
+		window_manager.progress_begin(0, len(filepaths))
+		self.set_status(context)
+		return {'RUNNING_MODAL'}
+
+	def modal(self, context, event):
+		# esc stops after the model that's being imported, everything finished so far stays
+		if event.type == 'ESC' and event.value == 'PRESS':
+			return self.finish(context)
+		# undo would free the models imported so far out from under the batch, so it waits until we're done
+		if event.type in UNDO_KEYS and (event.ctrl or event.oskey):
+			return {'RUNNING_MODAL'}
+		if event.type != 'TIMER':
+			return {'PASS_THROUGH'}
+		self.batch.step()
+		context.window_manager.progress_update(self.batch.index)
+		self.set_status(context)
+		if self.batch.done:
+			return self.finish(context)
+		return {'RUNNING_MODAL'}
+
+	def set_status(self, context):
+		batch = self.batch
+		current = os.path.basename(batch.filepaths[batch.index]) if not batch.done else ''
+		context.workspace.status_text_set(f'Importing {batch.index + 1}/{len(batch.filepaths)}: {current}   (Esc to stop)')
+
+	# FINISHED even when stopped early, so the models that did come in get their undo step
+	def finish(self, context):
+		self.stop(context)
+		self.batch.finish(context)
+		summary = self.batch.summary()
+		print(summary)
+		self.report({'WARNING'} if self.batch.errors or not self.batch.done else {'INFO'}, summary)
+		return {'FINISHED'}
+
+	# blender stopping the operator itself (loading another file, closing the window) - the batch's data may
+	# already be gone, so this only takes down the timer, progress and status text and leaves the file alone
+	def cancel(self, context):
+		self.stop(context)
+		self.batch.close()
+		print(f'import cancelled after {self.batch.index} of {len(self.batch.filepaths)} models')
+
+	def stop(self, context):
+		window_manager = context.window_manager
+		window_manager.event_timer_remove(self.timer)
+		window_manager.progress_end()
+		if context.workspace is not None:
+			context.workspace.status_text_set(None)
 
 def register():
 	bpy.utils.register_class(ImportModel)
+	ts4_watch.register()
 
 def unregister():
+	ts4_watch.unregister()
 	bpy.utils.unregister_class(ImportModel)
 
 
@@ -0,0 +1,120 @@
+# layered auto layout for shader node trees
+# works off the links instead of node names so it doesn't care which nodes are in the tree
+#   1. layers - longest path back from the output, so every node sits left of everything it feeds
+#   2. order - nodes in each layer sorted by where their links land in the layer to the right (barycenter)
+#   3. packing - layers placed right to left using node widths, nodes stacked by height without overlapping
+# every step is one pass over the nodes and links, apart from sorting inside each layer
+
+# node types that aren't part of the data flow
+SKIP_TYPES = {'FRAME'}
+GAP_X = 60
+GAP_Y = 30
+# rough distance from the top of a node to its first socket, and between sockets
+HEADER = 35
+SOCKET_SPACING = 22
+
+
+# sizes is [(width, height)], links is [(from index, to index, input socket index)]
+# nodes are expected in priority order - earlier nodes go higher up when there's a tie
+# returns [(x, y)] as top left corners, with the first sink's top left at anchor
+def layout(sizes, links, anchor=(0, 0)):
+	count = len(sizes)
+	outputs = [[] for _ in range(count)]
+	inputs = [[] for _ in range(count)]
+	for source, target, slot in links:
+		outputs[source].append((target, slot))
+		inputs[target].append((source, slot))
+
+	# kahn's algorithm run backwards from the sinks
+	layers = [0] * count
+	remaining = [len(outputs[node]) for node in range(count)]
+	queue = [node for node in range(count) if not remaining[node]]
+	for node in queue:
+		for source, slot in inputs[node]:
+			layers[source] = max(layers[source], layers[node] + 1)
+			remaining[source] -= 1
+			if not remaining[source]:
+				queue.append(source)
+
+	# first ordering is a depth first walk from the sinks following input sockets top to bottom
+	columns = [[] for _ in range(max(layers, default=0) + 1)]
+	seen = [False] * count
+	for sink in range(count):
+		if outputs[sink] or seen[sink]:
+			continue
+		stack = [sink]
+		while stack:
+			node = stack.pop()
+			if seen[node]:
+				continue
+			seen[node] = True
+			columns[layers[node]].append(node)
+			# reversed so the lowest socket index gets popped first
+			stack.extend(source for source, slot in sorted(inputs[node], key=lambda link: link[1], reverse=True))
+	# anything stuck in a cycle never made it into the walk
+	for node in range(count):
+		if not seen[node]:
+			columns[layers[node]].append(node)
+
+	# barycenter sweep away from the output, layer 0 keeps its order
+	rank = [0.0] * count
+	for layer, column in enumerate(columns):
+		if layer:
+			keys = {}
+			for position, node in enumerate(column):
+				targets = [rank[target] + slot / 1000 for target, slot in outputs[node]]
+				keys[node] = (sum(targets) / len(targets) if targets else float('inf'), position)
+			column.sort(key=keys.get)
+		for position, node in enumerate(column):
+			rank[node] = position / max(len(column), 1)
+
+	# packing - x by layer, y pulled towards the sockets each node feeds, then pushed down to clear the node above
+	positions = [(0.0, 0.0)] * count
+	right = anchor[0]
+	for layer, column in enumerate(columns):
+		if not column:
+			continue
+		width = max(sizes[node][0] for node in column)
+		left = right if layer == 0 else right - GAP_X - width
+		if layer == 0:
+			# the output column grows right from the anchor
+			right = left + width
+		floor = anchor[1] + GAP_Y
+		for node in column:
+			node_width, node_height = sizes[node]
+			# line our output socket (HEADER below our top) up with the input socket it feeds
+			wanted = [positions[target][1] - slot * SOCKET_SPACING for target, slot in outputs[node]]
+			top = sum(wanted) / len(wanted) if wanted else anchor[1]
+			top = min(top, floor - GAP_Y)
+			positions[node] = (left + width - node_width, top)
+			floor = top - node_height
+		right = left
+	return positions
+
+
+# estimate for nodes that haven't been drawn yet, dimensions are 0 until the node editor shows them
+def node_size(node):
+	if node.dimensions[0] and node.dimensions[1]:
+		return node.dimensions[0], node.dimensions[1]
+	sockets = sum(1 for socket in node.outputs if socket.enabled and not socket.hide)
+	sockets += sum(1 for socket in node.inputs if socket.enabled and not socket.hide)
+	return node.width, HEADER + sockets * SOCKET_SPACING + (150 if node.type == 'TEX_IMAGE' else 0)
+
+
+def arrange_tree(tree):
+	nodes = [node for node in tree.nodes if node.type not in SKIP_TYPES]
+	if not nodes:
+		return
+	linked = {link.from_node.name for link in tree.links} | {link.to_node.name for link in tree.links}
+	# output nodes first, then anything else that's linked, loose nodes last, top to bottom as they are now
+	nodes.sort(key=lambda node: (node.type != 'OUTPUT_MATERIAL', node.name not in linked, -node.location.y))
+	index = {node.name: i for i, node in enumerate(nodes)}
+	slots = {node.name: {socket.identifier: i for i, socket in enumerate(node.inputs)} for node in nodes}
+	links = [
+		(index[link.from_node.name], index[link.to_node.name], slots[link.to_node.name].get(link.to_socket.identifier, 0))
+		for link in tree.links
+		if link.from_node.name in index and link.to_node.name in index and not link.is_muted
+	]
+	anchor = (nodes[0].location.x, nodes[0].location.y)
+	for node, location in zip(nodes, layout([node_size(node) for node in nodes], links, anchor)):
+		node.location = location
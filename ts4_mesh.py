@@ -0,0 +1,202 @@
+import hashlib
+import numpy as np
+import bpy
+
+from ts4_core import find_doubles
+
+# mesh helpers that work on whole numpy arrays through foreach_get/foreach_set
+# nothing in here touches edit mode or bpy.ops, so it's safe to run on any mesh in object mode
+
+
+# fills an empty mesh from arrays
+# uvs is {layer name: (loops, 2) array}, normals is (loops, 3) or None
+def fill_mesh(mesh, positions, loop_verts, face_sizes, material_indices=None, smooth=None, uvs=None, normals=None):
+	loop_starts = np.zeros(len(face_sizes), dtype=np.int32)
+	np.cumsum(face_sizes[:-1], out=loop_starts[1:])
+	mesh.vertices.add(len(positions))
+	mesh.vertices.foreach_set('co', np.ascontiguousarray(positions, dtype=np.float32).ravel())
+	mesh.loops.add(len(loop_verts))
+	mesh.loops.foreach_set('vertex_index', np.ascontiguousarray(loop_verts, dtype=np.int32))
+	mesh.polygons.add(len(face_sizes))
+	# loop_total is worked out from loop_start since 4.0
+	mesh.polygons.foreach_set('loop_start', loop_starts)
+	if material_indices is not None:
+		mesh.polygons.foreach_set('material_index', np.ascontiguousarray(material_indices, dtype=np.int32))
+	if smooth is None:
+		smooth = np.ones(len(face_sizes), dtype=bool)
+	mesh.polygons.foreach_set('use_smooth', np.ascontiguousarray(smooth, dtype=bool))
+	for name, uv in (uvs or {}).items():
+		layer = mesh.uv_layers.new(name=name)
+		layer.data.foreach_set('uv', np.ascontiguousarray(uv, dtype=np.float32).ravel())
+	mesh.update(calc_edges=True)
+	mesh.validate(clean_customdata=False)
+	if normals is not None:
+		# validate can drop broken faces, only apply normals if the loops still line up
+		if len(normals) == len(mesh.loops):
+			if hasattr(mesh, 'use_auto_smooth'):
+				mesh.use_auto_smooth = True
+			mesh.normals_split_custom_set(np.asarray(normals, dtype=np.float32).tolist())
+
+
+def read_loop_normals(mesh):
+	normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+	# corner_normals replaced calc_normals_split in 4.1
+	if hasattr(mesh, 'corner_normals'):
+		mesh.corner_normals.foreach_get('vector', normals)
+	else:
+		mesh.calc_normals_split()
+		mesh.loops.foreach_get('normal', normals)
+	return normals.reshape(-1, 3)
+
+
+# returns (vertex indices, group indices, weights) for every weight in the mesh
+# there's no foreach_get for deform weights so this is the one python loop, one pass over the vertices
+def read_vertex_weights(mesh):
+	weights = [(vertex.index, group.group, group.weight) for vertex in mesh.vertices for group in vertex.groups]
+	if not weights:
+		return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+	vertices, groups, values = zip(*weights)
+	return np.array(vertices, dtype=np.int32), np.array(groups, dtype=np.int32), np.array(values, dtype=np.float32)
+
+
+# VertexGroup.add takes a list of vertices for a single weight, so weights are batched by (group, weight)
+# one add() per distinct pair instead of one per vertex
+def write_vertex_weights(groups, vertices, group_indices, weights):
+	if not len(vertices):
+		return
+	order = np.lexsort((weights, group_indices))
+	vertices = vertices[order]
+	group_indices = group_indices[order]
+	weights = weights[order]
+	breaks = np.flatnonzero((np.diff(group_indices) != 0) | (np.diff(weights) != 0)) + 1
+	starts = np.concatenate(([0], breaks))
+	ends = np.concatenate((breaks, [len(vertices)]))
+	for start, end in zip(starts, ends):
+		groups[group_indices[start]].add(vertices[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+
+# merges vertices closer than threshold in place, object mode only
+# carries over uvs, custom normals, materials and vertex groups; returns the number of vertices removed
+def weld_vertices(obj, threshold=0.0001):
+	mesh = obj.data
+	count = len(mesh.vertices)
+	positions = np.empty(count * 3, dtype=np.float32)
+	mesh.vertices.foreach_get('co', positions)
+	positions = positions.reshape(-1, 3)
+	labels = find_doubles(positions, threshold)
+	keep = labels == np.arange(count)
+	removed = count - int(keep.sum())
+	if not removed:
+		return 0
+	# old vertex index -> new vertex index
+	remap = (np.cumsum(keep) - 1)[labels]
+
+	loop_count = len(mesh.loops)
+	face_count = len(mesh.polygons)
+	loop_verts = np.empty(loop_count, dtype=np.int32)
+	mesh.loops.foreach_get('vertex_index', loop_verts)
+	loop_starts = np.empty(face_count, dtype=np.int32)
+	mesh.polygons.foreach_get('loop_start', loop_starts)
+	face_sizes = np.empty(face_count, dtype=np.int32)
+	mesh.polygons.foreach_get('loop_total', face_sizes)
+	material_indices = np.empty(face_count, dtype=np.int32)
+	mesh.polygons.foreach_get('material_index', material_indices)
+	smooth = np.empty(face_count, dtype=bool)
+	mesh.polygons.foreach_get('use_smooth', smooth)
+	uvs = {}
+	for layer in mesh.uv_layers:
+		uv = np.empty(loop_count * 2, dtype=np.float32)
+		layer.data.foreach_get('uv', uv)
+		uvs[layer.name] = uv.reshape(-1, 2)
+	normals = read_loop_normals(mesh) if mesh.has_custom_normals else None
+	weight_vertices, weight_groups, weights = read_vertex_weights(mesh)
+	group_names = [group.name for group in obj.vertex_groups]
+
+	# collapse loops that now point at the same vertex as the next loop in their face
+	# faces left with fewer than 3 loops are gone, same as remove_doubles
+	loop_verts = remap[loop_verts]
+	faces = np.repeat(np.arange(face_count), face_sizes)
+	following = np.arange(loop_count) + 1
+	last = loop_starts + face_sizes - 1
+	following[last] = loop_starts
+	keep_loops = loop_verts != loop_verts[following]
+	new_sizes = np.bincount(faces[keep_loops], minlength=face_count)
+	keep_faces = new_sizes >= 3
+	keep_loops &= keep_faces[faces]
+
+	# only the surviving representative of each vertex keeps its weights
+	weighted = keep[weight_vertices]
+
+	mesh.clear_geometry()
+	fill_mesh(
+		mesh,
+		positions[keep],
+		loop_verts[keep_loops],
+		new_sizes[keep_faces],
+		material_indices[keep_faces],
+		smooth[keep_faces],
+		{name: uv[keep_loops] for name, uv in uvs.items()},
+		normals[keep_loops] if normals is not None else None,
+	)
+	groups = [obj.vertex_groups.get(name) or obj.vertex_groups.new(name=name) for name in group_names]
+	write_vertex_weights(groups, remap[weight_vertices[weighted]], weight_groups[weighted], weights[weighted])
+	return removed
+
+
+def _hash_array(hasher, collection, attribute, dtype, width=1):
+	values = np.empty(len(collection) * width, dtype=dtype)
+	collection.foreach_get(attribute, values)
+	hasher.update(values.tobytes())
+
+
+# hash of everything in the mesh datablock - positions, faces, material indices, uvs, normals and weights
+# weights are stored by group index, so the object's group names go in too
+def mesh_fingerprint(obj):
+	mesh = obj.data
+	hasher = hashlib.blake2b(digest_size=20)
+	hasher.update(f'{len(mesh.vertices)}|{len(mesh.loops)}|{len(mesh.polygons)}'.encode())
+	_hash_array(hasher, mesh.vertices, 'co', np.float32, 3)
+	_hash_array(hasher, mesh.loops, 'vertex_index', np.int32)
+	_hash_array(hasher, mesh.polygons, 'loop_total', np.int32)
+	_hash_array(hasher, mesh.polygons, 'material_index', np.int32)
+	for layer in mesh.uv_layers:
+		hasher.update(layer.name.encode())
+		_hash_array(hasher, layer.data, 'uv', np.float32, 2)
+	hasher.update(read_loop_normals(mesh).tobytes())
+	hasher.update('|'.join(group.name for group in obj.vertex_groups).encode())
+	for values in read_vertex_weights(mesh):
+		hasher.update(values.tobytes())
+	return hasher.hexdigest()
+
+
+# points obj at an identical mesh that's already in the file, if there is one, and removes its own copy
+# materials move onto the object's slots so sims that share a mesh keep their own textures
+# returns True if the mesh was swapped
+def share_mesh(obj):
+	mesh = obj.data
+	if mesh.library is not None:
+		return False
+	fingerprint = mesh_fingerprint(obj)
+	for other in bpy.data.meshes:
+		if other is mesh or other.library is not None or other.get('ts4_fingerprint') != fingerprint:
+			continue
+		# the tag could be stale if the mesh was edited since, so check it against an object that uses it
+		user = next((user for user in bpy.data.objects if user.data is other), None)
+		if user is None or mesh_fingerprint(user) != fingerprint:
+			del other['ts4_fingerprint']
+			continue
+		materials = [slot.material for slot in obj.material_slots]
+		obj.data = other
+		for slot, material in zip(obj.material_slots, materials):
+			slot.link = 'OBJECT'
+			slot.material = material
+		if mesh.users == 0:
+			bpy.data.meshes.remove(mesh)
+		return True
+	mesh['ts4_fingerprint'] = fingerprint
+	return False
+
+
+# share_mesh on each object, returns how many now use an existing mesh
+def share_meshes(objects):
+	return sum(share_mesh(obj) for obj in objects if obj.type == 'MESH')
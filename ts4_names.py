@@ -0,0 +1,76 @@
+import bpy
+
+# names handed out while importing
+# blender only finds out a name is taken once it's set, then quietly adds .001 to it, and every lookup by name
+# is a search through the whole collection - both add up over a household or a few hundred sims
+# the registry reads the taken names once per batch and keeps track of everything it hands out after that,
+# so picking a free name is a set lookup however many sims are already in the file
+
+KINDS = ('objects', 'materials', 'meshes', 'images')
+ID_KINDS = {'OBJECT': 'objects', 'MATERIAL': 'materials', 'MESH': 'meshes', 'IMAGE': 'images'}
+
+# blender cuts names off at 63 bytes
+MAX_NAME = 63
+
+# every name a model uses, from its base name - they're all checked together so they always share a suffix
+MODEL_NAMES = (
+	('objects', '{}_rig'),
+	('objects', '{}'),
+	('objects', '{}_glass'),
+	('materials', '{}_material'),
+	('materials', '{}_glass_material'),
+)
+
+
+# name with suffix on the end, cut short so it fits with reserve bytes still to spare
+def _fit(name, suffix='', reserve=0):
+	limit = MAX_NAME - len(suffix.encode()) - reserve
+	return name.encode()[:limit].decode(errors='ignore') + suffix
+
+
+class NameRegistry:
+	def __init__(self):
+		self.taken = {kind: {id.name for id in getattr(bpy.data, kind)} for kind in KINDS}
+		# (kind, name) -> last number tried, so the next search for a free .00n starts from there
+		self.numbers = {}
+
+	# records the names of datablocks made after the registry was, so nothing gets handed their names
+	def track(self, *ids):
+		for id in ids:
+			if id is not None and id.id_type in ID_KINDS:
+				self.taken[ID_KINDS[id.id_type]].add(id.name)
+
+	def _next(self, key, name, is_free, reserve=0):
+		number = self.numbers.get(key, 0)
+		candidate = _fit(name, f'.{number:03}' if number else '', reserve)
+		while not is_free(candidate):
+			number += 1
+			candidate = _fit(name, f'.{number:03}', reserve)
+		self.numbers[key] = number
+		return candidate
+
+	# name if it's free, otherwise name.001, .002 ... the same as blender would pick - and reserves it
+	def unique(self, kind, name):
+		taken = self.taken[kind]
+		name = self._next((kind, name), name, lambda candidate: candidate not in taken)
+		taken.add(name)
+		return name
+
+	# a base name with every one of MODEL_NAMES free, name itself if it can be
+	# nothing is reserved yet, rename() does that as each name gets used
+	def model_name(self, name):
+		def is_free(base):
+			return not any(pattern.format(base) in self.taken[kind] for kind, pattern in MODEL_NAMES)
+		# leaves room for the longest of them
+		return self._next(('model', name), name, is_free, len('_glass_material'))
+
+	# renames id to name, or the next free name after it, and returns what it ended up as
+	def rename(self, id, name):
+		if id is None:
+			return None
+		taken = self.taken[ID_KINDS[id.id_type]]
+		taken.discard(id.name)
+		id.name = self.unique(ID_KINDS[id.id_type], name)
+		# if something the registry didn't know about had the name, blender has suffixed it - keep the real one
+		taken.add(id.name)
+		return id.name
@@ -1,50 +1,268 @@
+import os
+import json
+import uuid
+import hashlib
+import numpy as np
 import bpy
 
 # !!!! https://docs.blender.org/api/current/bpy.types.FileHandler.html read here
 
 
 
-def import_poses(context, filepath):
-    pack_name = get_pack_name()
-    paths = get_filepaths(filepath)
+def import_poses(context, directory, filenames=None, pack_name='', library='', skip_duplicates=True):
+    pack_name = pack_name or get_pack_name(directory)
+    paths = get_filepaths(directory, filenames)
+    # poses already in this file or the asset library, so copies can be dropped as they come in
+    # only a library set up in preferences gets searched, never just the folder this file happens to be in
+    asset_library = get_asset_library(context, library)
+    known = library_fingerprints(asset_library) if asset_library else {}
+    library = get_library_path(context, library)
+    known.update({fingerprint(action): action.name for action in bpy.data.actions})
+    poses = []
+    skipped = 0
     for path in paths:
-        import_pose(path, pack_name)
+        for action, posemaker in import_pose(path, pack_name):
+            pose_fingerprint = fingerprint(action)
+            if skip_duplicates and pose_fingerprint in known:
+                print(f'skipping {action.name}, same pose as {known[pose_fingerprint]}')
+                bpy.data.actions.remove(action)
+                skipped += 1
+                continue
+            known[pose_fingerprint] = action.name
+            poses.append((action, posemaker))
+    # catalogs and asset data for the whole pack in one go
+    # the poses only reach the library's index once this file is saved there, see library_fingerprints
+    save_poses(poses, pack_name, library)
+    print(f'imported {len(poses)} poses from {len(paths)} files in {pack_name}, skipped {skipped} duplicates')
     return {'FINISHED'}
 
 
-def get_pack_name():
-    # TODO make this a popup or something
-    # TODO discover this by directory name
-    return input('Pack name: ') # replace
+# pack name comes from the folder the poses are in, e.g. .../[iloon] emotional pack - FM/ -> [iloon] emotional pack - FM
+# sub-folders like af/ or am/ for age and gender are skipped over
+def get_pack_name(directory):
+    directory = os.path.normpath(directory)
+    name = os.path.basename(directory)
+    if len(name) <= 2:
+        name = os.path.basename(os.path.dirname(directory))
+    return name
 
 
-# returns list of strings
-def get_filepaths(filepath):
-    # iterate through files in filepath directory
-    # filepaths = TODO
-    dummy_filepath = 'C:/Users/Darby/Documents\renders/_projects/_POSES/iloon/[iloon] emotional pack - FM/af/' # repalce
-    return [f'{dummy_filepath}ah.blend', f'{dummy_filepath}angry2.blend', f'{dummy_filepath}ewww.blend'] # return filepaths
+# returns list of strings - the picked files, or every .blend in the directory if none were picked
+def get_filepaths(directory, filenames=None):
+    filenames = [filename for filename in filenames or [] if filename]
+    if not filenames:
+        filenames = sorted(filename for filename in os.listdir(directory) if filename.lower().endswith('.blend'))
+    return [os.path.join(directory, filename) for filename in filenames]
 
 
-# imports pose, renames, and then adds to asset library
+# imports the poses in one file and renames them, returns [(action, posemaker)]
 def import_pose(filepath, pack_name):
-    action = import_action(filepath)
+    actions = import_action(filepath)
     filename = bpy.path.display_name_from_filepath(filepath)
-    default_name = action[0]
-    posemaker = default_name.split('PosePack')[0]
-    action[0] = f'{posemaker}{pack_name}:{filename}' # action.name = f'{posemaker}{pack_name}:{filename}'
-    save_pose(action)
-
-def save_pose(pose):
-    # save action to asset library
-    print(f'saved {pose[0]} to asset library')    
-    
-
+    poses = []
+    for action in actions:
+        # pose files come in named like iloooon:PosePack_202106232002581848_set_1
+        posemaker = action.name.split('PosePack')[0]
+        action.name = f'{posemaker}{pack_name}:{filename}'
+        poses.append((action, posemaker))
+    return poses
+
+
+# marks every pose in the pack as an asset in a {posemaker}/{pack name} catalog
+# the catalog file is read once and written at most once per pack, however many poses there are
+def save_poses(poses, pack_name, library):
+    catalogs = read_catalogs(library) if library else {}
+    new_catalogs = {}
+    for action, posemaker in poses:
+        path = catalog_path(posemaker, pack_name)
+        if path not in catalogs:
+            catalogs[path] = new_catalogs[path] = catalog_id(path)
+    if library and new_catalogs:
+        write_catalogs(library, new_catalogs)
+    for action, posemaker in poses:
+        save_pose(action, catalogs[catalog_path(posemaker, pack_name)], posemaker, pack_name)
+
+
+def save_pose(pose, catalog, posemaker, pack_name):
+    # keep the action when the file is saved even though nothing uses it yet
+    pose.use_fake_user = True
+    # save action to asset library - asset_mark on the datablock, no operator or context needed
+    pose.asset_mark()
+    asset_data = pose.asset_data
+    asset_data.catalog_id = catalog
+    asset_data.author = posemaker.strip(': ')
+    asset_data.tags.new(pack_name, skip_if_exists=True)
+
+
+CATALOG_FILE = 'blender_assets.cats.txt'
+CATALOG_HEADER = """# This is an Asset Catalog Definition file for Blender.
+#
+# Empty lines and lines starting with `#` will be ignored.
+# The first non-ignored line should be the version indicator.
+# Other lines are of the format "UUID:catalog/path/for/assets:simple catalog name"
+
+VERSION 1
+
+"""
+
+
+# the named asset library from preferences, or the folder this .blend is saved in
+def get_library_path(context, name=''):
+    libraries = context.preferences.filepaths.asset_libraries
+    library = libraries.get(name) if name else None
+    if library is not None:
+        return bpy.path.abspath(library.path)
+    if bpy.data.filepath:
+        return os.path.dirname(bpy.data.filepath)
+    return ''
+
+
+# the named asset library from preferences, or the one this .blend is saved in - '' if it isn't in one
+def get_asset_library(context, name=''):
+    libraries = context.preferences.filepaths.asset_libraries
+    if name:
+        library = libraries.get(name)
+        return bpy.path.abspath(library.path) if library is not None else ''
+    if not bpy.data.filepath:
+        return ''
+    filepath = os.path.normcase(os.path.abspath(bpy.data.filepath))
+    for library in libraries:
+        path = os.path.normcase(os.path.abspath(bpy.path.abspath(library.path)))
+        if path and filepath.startswith(os.path.join(path, '')):
+            return bpy.path.abspath(library.path)
+    return ''
+
+
+# ':' separates the fields in the catalog file and '/' is the path separator, so neither can be in a name
+def catalog_path(posemaker, pack_name):
+    parts = [part.replace(':', '').replace('/', '-').strip() for part in (posemaker, pack_name)]
+    return '/'.join(part for part in parts if part)
+
+
+# same path always gets the same id, so re-importing a pack lands in the catalog it made last time
+def catalog_id(path):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f'ts4_pose_import/{path}'))
+
+
+# returns {catalog path: catalog id} for the catalogs already in the library
+def read_catalogs(library):
+    catalogs = {}
+    try:
+        with open(os.path.join(library, CATALOG_FILE), encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#') or line.startswith('VERSION'):
+                    continue
+                id, path, simple_name = (line.split(':', 2) + ['', ''])[:3]
+                catalogs[path] = id
+    except FileNotFoundError:
+        pass
+    return catalogs
+
+
+def write_catalogs(library, catalogs):
+    filepath = os.path.join(library, CATALOG_FILE)
+    new_file = not os.path.exists(filepath)
+    with open(filepath, 'a', encoding='utf-8') as file:
+        if new_file:
+            file.write(CATALOG_HEADER)
+        for path, id in catalogs.items():
+            file.write(f'{id}:{path}:{path.replace("/", "-")}\n')
+
+
+# keyframes are rounded to this before hashing so float noise between copies doesn't matter
+FINGERPRINT_TOLERANCE = 1e-4
+FINGERPRINT_FILE = 'ts4_pose_fingerprints.json'
+
+
+def action_fcurves(action):
+    # 4.4+ layered actions keep their curves in channelbags, older ones have them on the action
+    if getattr(action, 'layers', None):
+        return [fcurve for layer in action.layers for strip in layer.strips for channelbag in strip.channelbags for fcurve in channelbag.fcurves]
+    return list(action.fcurves)
+
+
+# hash of every keyframe in the action, independent of its name and of the order of its curves
+def fingerprint(action):
+    hasher = hashlib.blake2b(digest_size=16)
+    for fcurve in sorted(action_fcurves(action), key=lambda fcurve: (fcurve.data_path, fcurve.array_index)):
+        points = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float64)
+        fcurve.keyframe_points.foreach_get('co', points)
+        hasher.update(f'{fcurve.data_path}[{fcurve.array_index}]'.encode())
+        hasher.update(np.round(points / FINGERPRINT_TOLERANCE).astype(np.int64).tobytes())
+    return hasher.hexdigest()
+
+
+# {fingerprint: pose name} for every pose saved in a .blend in the library - an asset library from preferences,
+# it goes through every .blend under it
+# the index file keeps each .blend's poses by its mtime, so a file is only opened again once it's been saved again
+# files that are gone drop out of the index and a re-saved file's poses replace what it had before
+# this file is left out, its poses are read from bpy.data instead since it may not be saved yet
+def library_fingerprints(library):
+    index = read_fingerprints(library)
+    current = os.path.normcase(os.path.abspath(bpy.data.filepath)) if bpy.data.filepath else ''
+    fresh = {}
+    for path in library_files(library):
+        if os.path.normcase(path) == current:
+            continue
+        name = os.path.relpath(path, library)
+        mtime = os.stat(path).st_mtime_ns
+        entry = index.get(name)
+        if not isinstance(entry, dict) or entry.get('mtime') != mtime:
+            try:
+                entry = {'mtime': mtime, 'poses': blend_fingerprints(path)}
+            except (OSError, RuntimeError) as error:
+                print(f'could not read poses from {path}: {error}')
+                continue
+        fresh[name] = entry
+    if fresh != index:
+        write_fingerprints(library, fresh)
+    return {pose_fingerprint: pose for entry in fresh.values() for pose_fingerprint, pose in entry['poses'].items()}
+
+
+def library_files(library):
+    for folder, folders, filenames in os.walk(library):
+        for filename in filenames:
+            if filename.lower().endswith('.blend'):
+                yield os.path.abspath(os.path.join(folder, filename))
+
+
+# {fingerprint: pose name} for the pose assets in a .blend, linked in just long enough to hash them
+def blend_fingerprints(filepath):
+    libraries = set(bpy.data.libraries)
+    with bpy.data.libraries.load(filepath, link=True, assets_only=True) as (data_from, data_to):
+        data_to.actions = data_from.actions
+    actions = [action for action in data_to.actions if action is not None]
+    poses = {fingerprint(action): action.name for action in actions}
+    # unless the file was already linked in, take it back out again
+    for library in set(bpy.data.libraries) - libraries:
+        bpy.data.libraries.remove(library)
+    return poses
+
+
+# {.blend path in the library: {'mtime': ..., 'poses': {fingerprint: pose name}}} as of the last import
+def read_fingerprints(library):
+    try:
+        with open(os.path.join(library, FINGERPRINT_FILE), encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_fingerprints(library, index):
+    try:
+        with open(os.path.join(library, FINGERPRINT_FILE), 'w', encoding='utf-8') as file:
+            json.dump(index, file, indent=1)
+    except OSError as error:
+        print(f'could not write pose index: {error}')
+
+
+# every action in the file comes over in a single library load
 def import_action(filepath):
     print(f'importing {filepath}')
-    return ['iloooon:PosePack_202106232002581848_set_1', 2, 3] # return action
-
-
+    with bpy.data.libraries.load(filepath, link=False) as (data_from, data_to):
+        data_to.actions = data_from.actions
+    return [action for action in data_to.actions if action is not None]
 
 
 # ImportHelper is a helper class, defines filename and
@@ -89,12 +307,28 @@ class ImportPose(Operator, ImportHelper):
     directory: bpy.props.StringProperty(subtype='FILE_PATH', options={'SKIP_SAVE', 'HIDDEN'})
     files: bpy.props.CollectionProperty(type=bpy.types.OperatorFileListElement, options={'SKIP_SAVE', 'HIDDEN'})
 
-    # TODO figure out how to 
+    pack_name: StringProperty(
+        name="Pack Name",
+        description="Name used when renaming the poses, defaults to the folder name",
+        default="",
+    )
+
+    asset_library: StringProperty(
+        name="Asset Library",
+        description="Asset library to put the pose catalogs in, defaults to the folder this file is saved in",
+        default="",
+    )
+
+    skip_duplicates: BoolProperty(
+        name="Skip Duplicates",
+        description="Don't import poses that are already in this file, the asset library or earlier in the pack",
+        default=True,
+    )
+
     def execute(self, context):
-        # print(f'self.filepath = {self.filepath}')
-        # return import_poses(context, self.filepath)
-        print([file.name for file in self.files])
-        return {'FINISHED'}
+        directory = self.directory or os.path.dirname(self.filepath)
+        filenames = [file.name for file in self.files]
+        return import_poses(context, directory, filenames, self.pack_name, self.asset_library, self.skip_duplicates)
 
 
 # Only needed if you want to add into a dynamic menu.
@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import bpy
+
+try:
+	import psutil
+except ImportError:
+	psutil = None
+
+# per-stage timings and counters for import_dae
+# turn it on with TS4_STATS=1 (or ts4_stats.enabled = True), one json record per model goes to
+# TS4_STATS_FILE as json lines, or gets printed if that isn't set
+# when it's off every stage() is the same do-nothing object, so leaving the calls in costs next to nothing
+
+enabled = os.environ.get('TS4_STATS', '') not in ('', '0')
+output = os.environ.get('TS4_STATS_FILE', '')
+
+# the record for the model being imported right now
+current = None
+
+
+def _memory():
+	if psutil is not None:
+		return psutil.Process().memory_info().rss
+	try:
+		with open('/proc/self/statm') as file:
+			return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+	except (OSError, ValueError, AttributeError):
+		return 0
+
+
+# highest resident memory the process has reached, in bytes
+def peak_memory():
+	if psutil is not None:
+		info = psutil.Process().memory_info()
+		# only windows tracks the peak, elsewhere fall through to getrusage
+		if hasattr(info, 'peak_wset'):
+			return info.peak_wset
+	try:
+		import resource
+	except ImportError:
+		return _memory()
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# linux reports kilobytes, mac reports bytes
+	return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _datablocks():
+	data = bpy.data
+	return len(data.objects) + len(data.meshes) + len(data.materials) + len(data.images) + len(data.armatures) + len(data.actions)
+
+
+class _NullStage:
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+
+_null_stage = _NullStage()
+
+
+class _Stage:
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		self.memory = _memory()
+		self.datablocks = _datablocks()
+		return self
+
+	def __exit__(self, *exc):
+		stage = current['stages'].setdefault(self.name, {'calls': 0, 'seconds': 0.0, 'memory_delta': 0, 'datablocks_created': 0})
+		stage['calls'] += 1
+		stage['seconds'] += time.perf_counter() - self.start
+		stage['memory_delta'] += _memory() - self.memory
+		stage['datablocks_created'] += _datablocks() - self.datablocks
+		return False
+
+
+def begin_model(name, filepath):
+	global current
+	if not enabled:
+		return
+	current = {
+		'model': name,
+		'filepath': filepath,
+		'start': time.perf_counter(),
+		'memory': _memory(),
+		'datablocks': _datablocks(),
+		'stages': {},
+		'counters': {},
+	}
+
+
+# with ts4_stats.stage('parse'): ...
+# stages with the same name add up, so something called once per texture shows the total
+def stage(name):
+	if current is None:
+		return _null_stage
+	return _Stage(name)
+
+
+# adds to named counters on the current model, like vertices=..., faces=...
+def count(**counters):
+	if current is None:
+		return
+	for key, value in counters.items():
+		current['counters'][key] = current['counters'].get(key, 0) + value
+
+
+# finishes the record for the current model, writes it out and returns it
+def end_model():
+	global current
+	if current is None:
+		return None
+	record = current
+	current = None
+	record['seconds'] = time.perf_counter() - record.pop('start')
+	record['memory_delta'] = _memory() - record.pop('memory')
+	record['datablocks_created'] = _datablocks() - record.pop('datablocks')
+	line = json.dumps(record)
+	if output:
+		with open(output, 'a') as file:
+			file.write(line + '\n')
+	else:
+		print(line)
+	return record
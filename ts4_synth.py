@@ -0,0 +1,224 @@
+import os
+import sys
+import zlib
+import struct
+import argparse
+
+import numpy as np
+
+# writes fake TS4SimRipper exports for benchmarking - no blender needed
+# each model is a rig with a skinned body mesh, optionally a glass mesh, and the pngs TSR puts next to it
+# (ModelName_diffuse.png, ModelName_specular.png, ModelName_normalmap.png with spaces turned to '_')
+#   python ts4_synth.py --output synth/ --models 20 --vertices 60000 --duplicates 0.1 --glass
+
+COLLADA_NS = 'http://www.collada.org/2005/11/COLLADASchema'
+IDENTITY = '1 0 0 0 0 1 0 0 0 0 1 0 0 0 0 1'
+# TS4 meshes never use more than 4 bones per vertex
+MAX_INFLUENCES = 4
+
+
+# tiny solid colour png, written by hand so this doesn't need PIL
+def write_png(path, color, size=64):
+	row = b'\x00' + bytes(color) * size
+	raw = row * size
+	def chunk(kind, data):
+		return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+	with open(path, 'wb') as file:
+		file.write(b'\x89PNG\r\n\x1a\n')
+		file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 6, 0, 0, 0)))
+		file.write(chunk(b'IDAT', zlib.compress(raw)))
+		file.write(chunk(b'IEND', b''))
+
+
+def _floats(array):
+	return ' '.join(f'{value:.6g}' for value in np.asarray(array).ravel())
+
+
+def _ints(array):
+	return ' '.join(str(value) for value in np.asarray(array).ravel())
+
+
+# a closed-ish cylinder of roughly `vertices` vertices, then `duplicates` of them split into
+# coincident copies the way TSR splits vertices along uv seams
+def make_mesh(vertices, duplicates, rng, height=1.8, radius=0.2):
+	columns = max(int(np.sqrt(vertices / 4)), 3)
+	rows = max(vertices // columns, 2)
+	angle = np.linspace(0, 2 * np.pi, columns, endpoint=False)
+	y = np.linspace(0, height, rows)
+	ring, level = np.meshgrid(angle, y)
+	positions = np.stack([radius * np.cos(ring), level, radius * np.sin(ring)], axis=-1).reshape(-1, 3)
+	normals = np.stack([np.cos(ring), np.zeros_like(ring), np.sin(ring)], axis=-1).reshape(-1, 3)
+	uvs = np.stack([ring / (2 * np.pi), level / height], axis=-1).reshape(-1, 2)
+	index = np.arange(rows * columns).reshape(rows, columns)
+	right = np.roll(index, -1, axis=1)
+	a, b, c, d = index[:-1], right[:-1], index[1:], right[1:]
+	triangles = np.concatenate([np.stack([a, b, d], -1).reshape(-1, 3), np.stack([a, d, c], -1).reshape(-1, 3)])
+
+	count = int(len(positions) * duplicates)
+	if count:
+		originals = rng.choice(len(positions), count, replace=False)
+		copies = np.arange(len(positions), len(positions) + count)
+		positions = np.concatenate([positions, positions[originals]])
+		normals = np.concatenate([normals, normals[originals]])
+		uvs = np.concatenate([uvs, uvs[originals]])
+		# send about half the corners of each split vertex to its copy
+		lookup = np.full(len(positions), -1)
+		lookup[originals] = copies
+		flip = (lookup[triangles] >= 0) & (rng.random(triangles.shape) < 0.5)
+		triangles = np.where(flip, lookup[triangles], triangles)
+	return positions, normals, uvs, triangles
+
+
+def make_weights(vertex_count, joint_count, rng):
+	counts = rng.integers(1, MAX_INFLUENCES + 1, vertex_count)
+	joints = rng.integers(0, joint_count, counts.sum())
+	weights = rng.random(counts.sum()) + 0.05
+	starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+	weights /= np.repeat(np.add.reduceat(weights, starts), counts)
+	return counts, joints, weights
+
+
+# a spine with arms and legs hanging off it, enough depth to look like a real rig
+def make_joints(joint_count):
+	joints = []
+	for i in range(joint_count):
+		name = 'b__ROOT__' if i == 0 else f'b__Bone{i:03}__'
+		parent = None if i == 0 else (i - 1 if i < 8 else (i - 1 if i % 4 else 4 + i % 3))
+		joints.append((name, parent))
+	return joints
+
+
+def _geometry_xml(id, name, material, positions, normals, uvs, triangles):
+	return f'''<geometry id="{id}" name="{name}"><mesh>
+<source id="{id}-pos"><float_array id="{id}-pos-array" count="{positions.size}">{_floats(positions)}</float_array>
+<technique_common><accessor source="#{id}-pos-array" count="{len(positions)}" stride="3"><param name="X" type="float"/><param name="Y" type="float"/><param name="Z" type="float"/></accessor></technique_common></source>
+<source id="{id}-norm"><float_array id="{id}-norm-array" count="{normals.size}">{_floats(normals)}</float_array>
+<technique_common><accessor source="#{id}-norm-array" count="{len(normals)}" stride="3"><param name="X" type="float"/><param name="Y" type="float"/><param name="Z" type="float"/></accessor></technique_common></source>
+<source id="{id}-uv"><float_array id="{id}-uv-array" count="{uvs.size}">{_floats(uvs)}</float_array>
+<technique_common><accessor source="#{id}-uv-array" count="{len(uvs)}" stride="2"><param name="S" type="float"/><param name="T" type="float"/></accessor></technique_common></source>
+<vertices id="{id}-verts"><input semantic="POSITION" source="#{id}-pos"/></vertices>
+<triangles material="{material}" count="{len(triangles)}">
+<input semantic="VERTEX" source="#{id}-verts" offset="0"/><input semantic="NORMAL" source="#{id}-norm" offset="0"/><input semantic="TEXCOORD" source="#{id}-uv" offset="0" set="0"/>
+<p>{_ints(triangles)}</p></triangles>
+</mesh></geometry>'''
+
+
+def _controller_xml(id, geometry, joints, counts, influences, weights):
+	names = ' '.join(name for name, parent in joints)
+	inverse = ' '.join([IDENTITY] * len(joints))
+	v = np.stack([influences, np.arange(len(weights))], axis=-1)
+	return f'''<controller id="{id}"><skin source="#{geometry}"><bind_shape_matrix>{IDENTITY}</bind_shape_matrix>
+<source id="{id}-joints"><Name_array id="{id}-joints-array" count="{len(joints)}">{names}</Name_array>
+<technique_common><accessor source="#{id}-joints-array" count="{len(joints)}" stride="1"><param name="JOINT" type="name"/></accessor></technique_common></source>
+<source id="{id}-bind"><float_array id="{id}-bind-array" count="{16 * len(joints)}">{inverse}</float_array>
+<technique_common><accessor source="#{id}-bind-array" count="{len(joints)}" stride="16"><param name="TRANSFORM" type="float4x4"/></accessor></technique_common></source>
+<source id="{id}-weights"><float_array id="{id}-weights-array" count="{len(weights)}">{_floats(weights)}</float_array>
+<technique_common><accessor source="#{id}-weights-array" count="{len(weights)}" stride="1"><param name="WEIGHT" type="float"/></accessor></technique_common></source>
+<joints><input semantic="JOINT" source="#{id}-joints"/><input semantic="INV_BIND_MATRIX" source="#{id}-bind"/></joints>
+<vertex_weights count="{len(counts)}"><input semantic="JOINT" source="#{id}-joints" offset="0"/><input semantic="WEIGHT" source="#{id}-weights" offset="1"/>
+<vcount>{_ints(counts)}</vcount><v>{_ints(v)}</v></vertex_weights>
+</skin></controller>'''
+
+
+def _joint_xml(joints, index, children):
+	name = joints[index][0]
+	# each bone sits a little above its parent
+	inner = ''.join(_joint_xml(joints, child, children) for child in children[index])
+	return f'<node id="{name}" name="{name}" sid="{name}" type="JOINT"><matrix>1 0 0 0 0 1 0 0.1 0 0 1 0 0 0 0 1</matrix>{inner}</node>'
+
+
+def _effect_xml(id, diffuse, specular):
+	return f'''<effect id="{id}"><profile_COMMON>
+<newparam sid="{diffuse}-surface"><surface type="2D"><init_from>{diffuse}</init_from></surface></newparam>
+<newparam sid="{diffuse}-sampler"><sampler2D><source>{diffuse}-surface</source></sampler2D></newparam>
+<newparam sid="{specular}-surface"><surface type="2D"><init_from>{specular}</init_from></surface></newparam>
+<newparam sid="{specular}-sampler"><sampler2D><source>{specular}-surface</source></sampler2D></newparam>
+<technique sid="common"><phong>
+<ambient><color>0.5 0.5 0.5 1</color></ambient>
+<diffuse><texture texture="{diffuse}-sampler" texcoord="UVMap"/></diffuse>
+<specular><texture texture="{specular}-sampler" texcoord="UVMap"/></specular>
+</phong></technique></profile_COMMON></effect>'''
+
+
+# writes ModelName.dae plus its pngs into directory, returns the dae path
+def write_model(directory, name, vertices=60000, duplicates=0.1, glass=False, joint_count=60, seed=0):
+	rng = np.random.default_rng(seed)
+	clean_name = name.replace(' ', '_')
+	joints = make_joints(joint_count)
+	children = {index: [] for index in range(len(joints))}
+	for index, (joint, parent) in enumerate(joints):
+		if parent is not None:
+			children[parent].append(index)
+
+	meshes = [(clean_name, vertices)]
+	if glass:
+		meshes.append((f'{clean_name}_glass', max(vertices // 20, 16)))
+	images = []
+	effects = []
+	materials = []
+	geometries = []
+	controllers = []
+	nodes = []
+	for mesh_name, mesh_vertices in meshes:
+		diffuse, specular = f'{mesh_name}_diffuse.png', f'{mesh_name}_specular.png'
+		write_png(os.path.join(directory, diffuse), (200, 160, 140, 255))
+		write_png(os.path.join(directory, specular), (40, 40, 40, 128))
+		images.append(f'<image id="{diffuse}" name="{diffuse}"><init_from>{diffuse}</init_from></image>')
+		images.append(f'<image id="{specular}" name="{specular}"><init_from>{specular}</init_from></image>')
+		effects.append(_effect_xml(f'{mesh_name}-effect', diffuse, specular))
+		materials.append(f'<material id="{mesh_name}-material" name="{mesh_name}"><instance_effect url="#{mesh_name}-effect"/></material>')
+		positions, normals, uvs, triangles = make_mesh(mesh_vertices, duplicates, rng)
+		geometries.append(_geometry_xml(f'{mesh_name}-mesh', mesh_name, 'material', positions, normals, uvs, triangles))
+		counts, influences, weights = make_weights(len(positions), len(joints), rng)
+		controllers.append(_controller_xml(f'{mesh_name}-skin', f'{mesh_name}-mesh', joints, counts, influences, weights))
+		nodes.append(
+			f'<node id="{mesh_name}" name="{mesh_name}" type="NODE"><instance_controller url="#{mesh_name}-skin">'
+			f'<skeleton>#{joints[0][0]}</skeleton><bind_material><technique_common>'
+			f'<instance_material symbol="material" target="#{mesh_name}-material"/>'
+			f'</technique_common></bind_material></instance_controller></node>'
+		)
+	write_png(os.path.join(directory, f'{clean_name}_normalmap.png'), (128, 128, 255, 255))
+
+	rig = f'<node id="{clean_name}_rig" name="{clean_name}_rig" type="NODE">{_joint_xml(joints, 0, children)}</node>'
+	filepath = os.path.join(directory, f'{name}.dae')
+	with open(filepath, 'w') as file:
+		file.write(f'''<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="{COLLADA_NS}" version="1.4.1">
+<asset><contributor><authoring_tool>ts4_synth</authoring_tool></contributor><unit name="meter" meter="1"/><up_axis>Y_UP</up_axis></asset>
+<library_images>{''.join(images)}</library_images>
+<library_effects>{''.join(effects)}</library_effects>
+<library_materials>{''.join(materials)}</library_materials>
+<library_geometries>{''.join(geometries)}</library_geometries>
+<library_controllers>{''.join(controllers)}</library_controllers>
+<library_visual_scenes><visual_scene id="Scene" name="Scene">{rig}{''.join(nodes)}</visual_scene></library_visual_scenes>
+<scene><instance_visual_scene url="#Scene"/></scene>
+</COLLADA>
+''')
+	return filepath
+
+
+def write_models(directory, models=10, vertices=60000, duplicates=0.1, glass=False, joint_count=60, seed=0):
+	os.makedirs(directory, exist_ok=True)
+	return [
+		write_model(directory, f'Synth Sim {index:03}', vertices, duplicates, glass and index % 2 == 0, joint_count, seed + index)
+		for index in range(models)
+	]
+
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='Write fake TS4SimRipper DAE exports for benchmarking')
+	parser.add_argument('--output', required=True)
+	parser.add_argument('--models', type=int, default=10)
+	parser.add_argument('--vertices', type=int, default=60000)
+	parser.add_argument('--duplicates', type=float, default=0.1, help='fraction of vertices split into coincident copies')
+	parser.add_argument('--glass', action='store_true', help='give every other model a glass mesh')
+	parser.add_argument('--joints', type=int, default=60)
+	parser.add_argument('--seed', type=int, default=0)
+	args = parser.parse_args(argv)
+	for filepath in write_models(args.output, args.models, args.vertices, args.duplicates, args.glass, args.joints, args.seed):
+		print(filepath)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+import os
+import bpy
+
+import ts4_stats
+
+# texture cache shared by every import in the session
+# keyed by (absolute path, mtime, size) so sims that share textures or get re-imported reuse one image
+# instead of piling up foo_normalmap.png.001, .002 ...
+# images are stored by name - holding on to the datablocks themselves isn't safe across undo
+
+# (path, mtime, size) -> image name
+cache = {}
+# path -> the key it was last loaded with, so a changed file reloads the same datablock
+paths = {}
+
+
+def _key(path):
+	stat = os.stat(path)
+	return (os.path.normcase(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _matches(image, path):
+	return image.source == 'FILE' and image.filepath and os.path.normcase(os.path.normpath(bpy.path.abspath(image.filepath))) == os.path.normcase(path)
+
+
+# names can be reused once a datablock is gone, so a cached name only counts if it still points at path
+def _get_image(name, path):
+	image = bpy.data.images.get(name or '')
+	return image if image is not None and _matches(image, path) else None
+
+
+def _find_image(path):
+	for image in bpy.data.images:
+		if _matches(image, path):
+			return image
+	return None
+
+
+# returns the image for path, loading it only if nothing in the file already has it
+def load_image(path):
+	with ts4_stats.stage('texture_load'):
+		return _load_image(path)
+
+
+def _load_image(path):
+	path = os.path.normpath(os.path.abspath(bpy.path.abspath(path)))
+	try:
+		key = _key(path)
+	except OSError:
+		print(f'could not find image {path}')
+		return None
+	image = _get_image(cache.get(key), path)
+	if image is not None:
+		return image
+	old_key = paths.get(key[0])
+	image = _get_image(cache.pop(old_key, None), path) if old_key else None
+	if image is not None:
+		# same file, new contents - reload in place so everything using it updates
+		image.reload()
+	else:
+		image = _find_image(path)
+	if image is None:
+		try:
+			image = bpy.data.images.load(path, check_existing=True)
+		except RuntimeError:
+			print(f'could not load image {path}')
+			return None
+		# keep paths relative like image.open did when the .blend has been saved
+		if bpy.data.is_saved:
+			try:
+				image.filepath_raw = bpy.path.relpath(path)
+			except ValueError:
+				# different drive on windows, has to stay absolute
+				pass
+	cache[key] = image.name
+	paths[key[0]] = key
+	return image
+
+
+# for an image that came in with appended objects (a cache hit, a batch worker's output) instead of through
+# load_image - if the file already has that texture, everything using the new copy gets pointed at it and the
+# copy is removed, otherwise the new one goes in the cache for later imports to use
+# returns whichever image is kept
+def adopt_image(image):
+	if image.source != 'FILE' or not image.filepath or image.library is not None:
+		return image
+	path = os.path.normpath(os.path.abspath(bpy.path.abspath(image.filepath)))
+	try:
+		key = _key(path)
+	except OSError:
+		return image
+	existing = _get_image(cache.get(key), path)
+	if existing is None:
+		existing = next((other for other in bpy.data.images if other != image and other.library is None and _matches(other, path)), None)
+	if existing is not None and existing != image:
+		image.user_remap(existing)
+		bpy.data.images.remove(image)
+		image = existing
+	cache[key] = image.name
+	paths[key[0]] = key
+	return image
+
+
+# reloads every image using path in place after the file changed on disk, returns how many there were
+def reload_image(path):
+	path = os.path.normpath(os.path.abspath(bpy.path.abspath(path)))
+	images = [image for image in bpy.data.images if _matches(image, path)]
+	for image in images:
+		image.reload()
+	try:
+		key = _key(path)
+	except OSError:
+		return len(images)
+	# point the cache at the new contents so load_image doesn't reload them a second time
+	old_key = paths.get(key[0])
+	if old_key is not None and old_key != key:
+		cache.pop(old_key, None)
+	if images:
+		cache[key] = images[0].name
+		paths[key[0]] = key
+	return len(images)
+
+
+# drops cache entries for images that were deleted, and removes cached images nothing uses any more
+# returns the number of images removed
+def evict_unused():
+	removed = 0
+	for key, name in list(cache.items()):
+		image = bpy.data.images.get(name)
+		if image is not None and image.users == 0:
+			bpy.data.images.remove(image)
+			removed += 1
+			image = None
+		if image is None:
+			del cache[key]
+			if paths.get(key[0]) == key:
+				del paths[key[0]]
+	return removed
@@ -0,0 +1,148 @@
+import os
+import hashlib
+import traceback
+import bpy
+
+import ts4_collada
+import ts4_core
+import ts4_mesh
+import ts4_textures
+
+# watch mode for re-exporting from TS4SimRipper while fixing CAS parts
+# every imported rig remembers its dae in rig['ts4_source'], a timer keeps checking that file and the pngs it uses
+# a changed dae rebuilds just the mesh data on the existing objects, a changed png reloads the image in place
+# the rig, objects, modifiers, materials and poses all stay as they are - no new rig and no .001 copies
+# files are compared by mtime and size first and only hashed when those change, so a touched file does nothing
+
+# seconds between checks
+INTERVAL = 1.0
+
+# path -> (mtime_ns, size, hash) as of the last check
+files = {}
+# dae path -> the texture paths it uses, worked out again whenever the dae changes
+textures = {}
+running = False
+
+
+def _hash(path):
+	hasher = hashlib.blake2b(digest_size=20)
+	with open(path, 'rb') as file:
+		for block in iter(lambda: file.read(2**20), b''):
+			hasher.update(block)
+	return hasher.hexdigest()
+
+
+# records path as it is now, returns True if its contents changed since the last time it was recorded
+# a file seen for the first time is only recorded, and a missing one is left alone - TSR may be mid-export
+def changed(path):
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return False
+	old = files.get(path)
+	if old is not None and old[:2] == (stat.st_mtime_ns, stat.st_size):
+		return False
+	try:
+		digest = _hash(path)
+	except OSError:
+		return False
+	files[path] = (stat.st_mtime_ns, stat.st_size, digest)
+	return old is not None and old[2] != digest
+
+
+# {dae path: [rigs imported from it]} for every rig in the file
+def watched():
+	sources = {}
+	for obj in bpy.data.objects:
+		if obj.type == 'ARMATURE' and obj.library is None and obj.get('ts4_source'):
+			sources.setdefault(obj['ts4_source'], []).append(obj)
+	return sources
+
+
+def texture_paths(filepath):
+	if filepath not in textures:
+		textures[filepath] = ts4_core.read_image_paths(filepath)
+	return textures[filepath]
+
+
+# rebuilds the meshes under rig from the dae, merging again where the import merged
+def reimport(filepath, rig):
+	dae = ts4_core.read_dae(filepath)
+	objects = {obj['ts4_node']: obj for obj in rig.children if obj.type == 'MESH' and obj.get('ts4_node')}
+	updated = ts4_collada.rebuild_meshes(dae, objects)
+	for obj in updated:
+		if obj.get('ts4_merge'):
+			ts4_mesh.weld_vertices(obj)
+	print(f'{rig.name}: updated {", ".join(obj.name for obj in updated) or "nothing"}')
+	return updated
+
+
+# one pass over every watched file
+def check():
+	for filepath, rigs in watched().items():
+		if changed(filepath):
+			textures.pop(filepath, None)
+			for rig in rigs:
+				try:
+					reimport(filepath, rig)
+				except Exception:
+					# most likely caught the file half written, the next write changes it again and gets another go
+					print(f'could not re-import {filepath}:\n{traceback.format_exc()}')
+		if not os.path.exists(filepath):
+			continue
+		for path in texture_paths(filepath):
+			if changed(path) and ts4_textures.reload_image(path):
+				print(f'reloaded {path}')
+
+
+def _timer():
+	if not running:
+		return None
+	# an exception would stop the timer for good, so just report it and try again next time
+	try:
+		check()
+	except Exception:
+		traceback.print_exc()
+	return INTERVAL
+
+
+# the first check only records how everything is now, changes are picked up from there on
+def start():
+	global running
+	if running:
+		return
+	running = True
+	check()
+	bpy.app.timers.register(_timer, first_interval=INTERVAL, persistent=True)
+
+
+def stop():
+	global running
+	running = False
+	if bpy.app.timers.is_registered(_timer):
+		bpy.app.timers.unregister(_timer)
+	files.clear()
+	textures.clear()
+
+
+class WatchImports(bpy.types.Operator):
+	"""Update imported sims in place whenever their DAE or textures are exported again"""
+	bl_idname = 'import_test.watch_imports'
+	bl_label = 'Watch TS4 Imports'
+
+	def execute(self, context):
+		if running:
+			stop()
+			self.report({'INFO'}, 'Stopped watching TS4 imports')
+		else:
+			start()
+			self.report({'INFO'}, f'Watching {len(files)} files')
+		return {'FINISHED'}
+
+
+def register():
+	bpy.utils.register_class(WatchImports)
+
+def unregister():
+	stop()
+	bpy.utils.unregister_class(WatchImports)